@@ -0,0 +1,190 @@
+"""Benchmark the PCM normalization path in custom_components/hl_vox/media.py.
+
+Compares the per-sample reference path (decode to Python floats, interpolate
+in a loop, struct.pack) with the batched engine used by concat_wavs, checks
+that both produce identical bytes, and reports timings per clip and per
+phrase. Also reports the size and encode time of a phrase in each output
+codec, and compares the linear and polyphase resamplers: throughput, and
+how much of a tone above the output Nyquist rate aliases back into the
+11025 Hz output (lower is better).
+
+    python benchmarks/bench_media.py                 # synthetic VOX-like clips
+    python benchmarks/bench_media.py /config/hl_vox/sounds
+
+No Home Assistant install is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import math
+import random
+import sys
+import tempfile
+import time
+import wave
+from array import array
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MEDIA_PY = ROOT / "custom_components" / "hl_vox" / "media.py"
+
+
+def _load_media():
+    spec = importlib.util.spec_from_file_location("hl_vox_media", MEDIA_PY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+media = _load_media()
+
+
+def _write_clip(path: Path, rate: int, sampwidth: int, nch: int, seconds: float) -> None:
+    rng = random.Random(path.name)
+    nframes = int(rate * seconds)
+    frames = bytearray()
+    for i in range(nframes):
+        value = 0.6 * math.sin(2 * math.pi * 440 * i / rate) + rng.uniform(-0.2, 0.2)
+        for _ in range(nch):
+            if sampwidth == 1:
+                frames.append(max(0, min(255, int((value + 1.0) * 127.5))))
+            else:
+                frames += int(max(-1.0, min(1.0, value)) * 32767).to_bytes(
+                    2, "little", signed=True
+                )
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(nch)
+        w.setsampwidth(sampwidth)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+
+
+def _synthetic_clips(directory: Path) -> list[Path]:
+    """VOX-like clips: mostly 8-bit mono 11025 Hz, plus a few custom formats."""
+    specs = [(11025, 1, 1, 0.4 + 0.05 * i) for i in range(10)]
+    specs += [(11025, 2, 1, 0.6), (22050, 2, 1, 0.6), (44100, 2, 2, 0.6), (22050, 1, 2, 0.6)]
+    paths = []
+    for i, (rate, sw, nch, seconds) in enumerate(specs):
+        path = directory / f"clip{i:02d}_{rate}_{sw * 8}bit_{nch}ch.wav"
+        _write_clip(path, rate, sw, nch, seconds)
+        paths.append(path)
+    return paths
+
+
+def _reference(path: Path) -> bytes:
+    samples, _nch, _sw, rate = media._read_samples_and_params(path)
+    samples = media._resample_linear(samples, rate, media.TARGET_FRAMERATE)
+    return media._samples_to_frames(samples, media.TARGET_SAMPWIDTH)
+
+
+def _tone_pcm(rate: int, freq: float, seconds: float = 1.0) -> bytes:
+    """A 16-bit mono sine at half scale."""
+    return b"".join(
+        int(16384 * math.sin(2 * math.pi * freq * i / rate)).to_bytes(
+            2, "little", signed=True
+        )
+        for i in range(int(rate * seconds))
+    )
+
+
+def _rms_db(pcm: bytes, reference: float) -> float:
+    """RMS level of 16-bit PCM relative to reference, in dB (floor -120)."""
+    samples = array("h", pcm)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    # Skip the filter's edge transients
+    body = samples[200:-200] or samples
+    rms = math.sqrt(sum(s * s for s in body) / max(len(body), 1))
+    return 20 * math.log10(rms / reference) if rms else -120.0
+
+
+def _bench_resamplers(repeat: int) -> None:
+    target = media.TARGET_FRAMERATE
+    print(
+        f"\n{'resample':14} {'quality':10} {'ms/s audio':>11} "
+        f"{'Msamples/s':>11} {'alias dB':>9}"
+    )
+    for rate in (8000, 16000, 22050, 44100, 48000):
+        pcm = _tone_pcm(rate, 1000)
+        # A tone between the output and input Nyquist rates must be filtered
+        # out; when upsampling there is nothing to alias
+        alias_pcm = _tone_pcm(rate, 0.42 * rate) if rate > target else None
+        for quality in media.RESAMPLE_QUALITIES:
+            media._normalize_pcm(pcm, 1, 2, rate, quality=quality)  # design filters
+            elapsed = _best_of(
+                media._normalize_pcm, pcm, 1, 2, rate, repeat=repeat, quality=quality
+            )
+            alias = f"{'-':>9}"
+            if alias_pcm is not None:
+                out = media._normalize_pcm(alias_pcm, 1, 2, rate, quality=quality)
+                alias = f"{_rms_db(out, 16384 / math.sqrt(2)):9.1f}"
+            print(
+                f"{f'{rate} -> {target}':14} {quality:10} {elapsed * 1000:11.2f} "
+                f"{rate / elapsed / 1e6:11.2f} {alias}"
+            )
+
+
+def _best_of(func, *args, repeat: int, **kwargs) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sounds_dir", nargs="?", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.sounds_dir:
+            clips = sorted(args.sounds_dir.glob("*.wav"))[:20]
+        else:
+            clips = _synthetic_clips(Path(tmp))
+        print(f"numpy: {'yes' if media.np is not None else 'no'}")
+        print(f"{'clip':40} {'reference ms':>13} {'batched ms':>11} {'speedup':>8}")
+        for clip in clips:
+            if _reference(clip) != media._normalize_to_target(clip):
+                print(f"{clip.name}: OUTPUT MISMATCH")
+                return 1
+            ref = _best_of(_reference, clip, repeat=args.repeat)
+            new = _best_of(media._normalize_to_target, clip, repeat=args.repeat)
+            print(f"{clip.name:40} {ref * 1000:13.2f} {new * 1000:11.2f} {ref / new:7.1f}x")
+
+        phrase = clips[:10]
+        ref_phrase = _best_of(lambda: [_reference(c) for c in phrase], repeat=args.repeat)
+        out = Path(tmp) / "phrase.wav"
+        new_phrase = _best_of(media.concat_wavs, phrase, out, 150, repeat=args.repeat)
+        print(
+            f"\nphrase ({len(phrase)} clips): reference {ref_phrase * 1000:.2f} ms, "
+            f"concat_wavs {new_phrase * 1000:.2f} ms, "
+            f"speedup {ref_phrase / new_phrase:.1f}x"
+        )
+
+        pcm = b"".join(
+            bytes(f) for f in media._concat_frames(phrase, 150, media._normalize_to_target)
+        )
+        frames = len(pcm) // media.TARGET_SAMPWIDTH
+        pcm16_size = media.CODECS[media.CODEC_PCM16].data_size(frames)
+        print(f"\n{'codec':12} {'bytes':>9} {'of pcm16':>9} {'encode ms':>10}")
+        for name, codec in media.CODECS.items():
+
+            def _encode(codec=codec) -> bytes:
+                encoder = codec.encoder()
+                return bytes(encoder.feed(pcm)) + encoder.flush()
+
+            size = len(codec.header(frames)) + len(_encode())
+            encode = _best_of(_encode, repeat=args.repeat)
+            print(f"{name:12} {size:9d} {size / pcm16_size:8.0%} {encode * 1000:10.2f}")
+
+    _bench_resamplers(args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""Benchmark suite for media.py and the audio view, with JSON results.
+
+Generates synthetic VOX-like clips in every combination of 8/16-bit,
+11025/22050/44100 Hz and mono/stereo, then measures:
+
+- normalizing one clip of each format (_normalize_to_target)
+- concat_wavs and concat_wavs_to_bytes on a phrase of all the clips
+- HlVoxAudioView.get through an aiohttp test server: cold (nothing
+  cached, the phrase is built and streamed), disk (served from the cache
+  file) and warm (served from the in-memory hot cache)
+
+Each result has the best and median latency in ms, the throughput in
+seconds of audio per second, and the peak traced memory in KiB
+(tracemalloc, on a separate run so it does not skew the timings). The
+view results also include the integration's own per-stage timings.
+
+    python benchmarks/bench_pipeline.py --output results.json
+    python benchmarks/bench_pipeline.py --compare results.json
+
+--compare exits with status 1 if any best latency regressed by more than
+--threshold (default 25%). The view benchmarks need Home Assistant to be
+importable (the view is a HomeAssistantView) and are skipped otherwise;
+they run against an in-process test server and the minimal hass stand-in
+from tests/hass_stub.py, with no network and no running Home Assistant.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from bench_media import _write_clip, media
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "tests"))
+
+from hass_stub import StubHass, import_integration_modules  # noqa: E402
+
+RATES = (11025, 22050, 44100)
+SAMPLE_WIDTHS = (1, 2)
+CHANNELS = (1, 2)
+CLIP_SECONDS = 0.5
+SILENCE_MS = 150
+DEFAULT_THRESHOLD = 0.25
+
+
+def synthetic_formats() -> list[tuple[int, int, int]]:
+    """Every (rate, sample width, channels) combination benchmarked."""
+    return [
+        (rate, sw, nch) for rate in RATES for sw in SAMPLE_WIDTHS for nch in CHANNELS
+    ]
+
+
+def write_synthetic_clips(directory: Path) -> list[Path]:
+    """One tone-plus-noise clip per format, named after it."""
+    paths = []
+    for rate, sw, nch in synthetic_formats():
+        path = directory / f"vox_{rate}_{sw * 8}bit_{nch}ch.wav"
+        _write_clip(path, rate, sw, nch, CLIP_SECONDS)
+        paths.append(path)
+    return paths
+
+
+def _result(
+    times: list[float], peak: int, audio_seconds: float, **extra: Any
+) -> dict[str, Any]:
+    best = min(times)
+    return {
+        "best_ms": round(best * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "audio_s_per_s": round(audio_seconds / best, 1),
+        "peak_kib": round(peak / 1024, 1),
+        "runs": len(times),
+        **extra,
+    }
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, audio_seconds: float
+) -> dict[str, Any]:
+    """Time func repeat times, then trace one more run for peak memory."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return _result(times, peak, audio_seconds)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]],
+    repeat: int,
+    audio_seconds: float,
+    before: Callable[[], Awaitable[Any]] | None = None,
+) -> dict[str, Any]:
+    """Async version of measure; before() runs untimed ahead of every run."""
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            await before()
+        start = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - start)
+    if before is not None:
+        await before()
+    tracemalloc.start()
+    try:
+        await func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return _result(times, peak, audio_seconds)
+
+
+def bench_media(clips: list[Path], tmp: Path, repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for clip in clips:
+        results[f"normalize/{clip.stem}"] = measure(
+            lambda clip=clip: media._normalize_to_target(clip), repeat, CLIP_SECONDS
+        )
+    phrase_seconds = len(clips) * CLIP_SECONDS + (len(clips) - 1) * SILENCE_MS / 1000
+    out = tmp / "phrase.wav"
+    results["concat_wavs"] = measure(
+        lambda: media.concat_wavs(clips, out, SILENCE_MS), repeat, phrase_seconds
+    )
+    results["concat_wavs_to_bytes"] = measure(
+        lambda: media.concat_wavs_to_bytes(clips, SILENCE_MS), repeat, phrase_seconds
+    )
+    return results
+
+
+async def _bench_view(
+    modules: dict[str, types.ModuleType], sounds: Path, clips: list[Path], repeat: int
+) -> dict[str, Any]:
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    base = sounds.parent
+    cache_dir = base / "cache"
+    cache_dir.mkdir()
+    hass = StubHass()
+    clip_cache = modules["clip_cache"].ClipPcmCache(16 << 20)
+    clip_store = modules["clip_store"].ClipStore(
+        base / "clip_store", sounds, clip_cache.load
+    )
+    clip_store.build()
+    catalog = modules["catalog"].ClipCatalog(sounds, base / "clip_catalog.json")
+    catalog.refresh()
+    hot_phrases = modules["clip_cache"].ByteLru(8 << 20)
+    metrics = modules["metrics"].Metrics()
+    names = [clip.stem for clip in clips]
+    hass.data["hl_vox"] = {
+        "phrases": {"bench": names},
+        "sounds_path": sounds,
+        "cache_dir": cache_dir,
+        "silence_ms": SILENCE_MS,
+        "catalog": catalog,
+        "clip_cache": clip_cache,
+        "clip_store": clip_store,
+        "builder": modules["render"].PhraseBuilder(hass),
+        "hot_phrases": hot_phrases,
+        "metrics": metrics,
+    }
+    view = modules["http"].HlVoxAudioView(hass)
+    app = web.Application()
+
+    async def _handler(request: web.Request) -> web.StreamResponse:
+        return await view.get(request, **request.match_info)
+
+    app.router.add_get("/api/hl_vox/audio/{phrase_id}", _handler)
+    phrase_seconds = len(clips) * CLIP_SECONDS + (len(clips) - 1) * SILENCE_MS / 1000
+
+    builder = hass.data["hl_vox"]["builder"]
+    key = modules["render"].render_key(catalog, names, SILENCE_MS)
+
+    async def _settle() -> None:
+        # A streamed build finishes (moves its file into place and fills the
+        # hot cache) just after the player has received the last byte
+        while builder.is_building(key):
+            await asyncio.sleep(0.001)
+
+    async def _clear_cache() -> None:
+        await _settle()
+        hot_phrases.clear()
+        for path in cache_dir.iterdir():
+            path.unlink()
+
+    async def _clear_hot_cache() -> None:
+        await _settle()
+        hot_phrases.clear()
+
+    results: dict[str, Any] = {}
+    async with TestClient(TestServer(app)) as client:
+
+        async def _get() -> None:
+            response = await client.get("/api/hl_vox/audio/bench")
+            body = await response.read()
+            if response.status != 200 or not body:
+                raise RuntimeError(f"View returned {response.status}")
+
+        for name, before in (
+            ("view/cold", _clear_cache),
+            ("view/disk", _clear_hot_cache),
+            ("view/warm", None),
+        ):
+            if before is None:
+                await _get()  # fill the hot cache
+            metrics.clear()
+            results[name] = await measure_async(_get, repeat, phrase_seconds, before)
+            # Let the server finish recording the last response
+            await asyncio.sleep(0.05)
+            results[name]["stages_ms"] = metrics.as_dict()
+    return results
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print best latencies against a baseline; return the regressed names."""
+    regressions = []
+    print(f"\n{'benchmark':36} {'baseline ms':>12} {'now ms':>9} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or "best_ms" not in result:
+            continue
+        change = (
+            result["best_ms"] / before["best_ms"] - 1 if before["best_ms"] else 0.0
+        )
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:36} {before['best_ms']:12.3f} {result['best_ms']:9.3f} "
+            f"{change:+7.0%}{flag}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument(
+        "--compare", type=Path, help="baseline JSON from an earlier run"
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--skip-view", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sounds = Path(tmp) / "sounds"
+        sounds.mkdir()
+        clips = write_synthetic_clips(sounds)
+        results = bench_media(clips, Path(tmp), args.repeat)
+        modules = (
+            None
+            if args.skip_view
+            else import_integration_modules(
+                "catalog", "clip_cache", "clip_store", "http", "metrics", "render"
+            )
+        )
+        if modules is not None:
+            results.update(
+                asyncio.run(_bench_view(modules, sounds, clips, args.repeat))
+            )
+        elif not args.skip_view:
+            print("Home Assistant is not installed; skipping the view benchmarks")
+
+    print(
+        f"{'benchmark':36} {'best ms':>9} {'median ms':>10} "
+        f"{'audio s/s':>10} {'peak KiB':>9}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:36} {result['best_ms']:9.3f} {result['median_ms']:10.3f} "
+            f"{result['audio_s_per_s']:10.1f} {result['peak_kib']:9.1f}"
+        )
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": media.np is not None,
+            "repeat": args.repeat,
+            "formats": synthetic_formats(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text()).get("results", {})
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,88 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import logging
+from collections.abc import Mapping
 from pathlib import Path
+from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
-
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+
+from .announcer import PRIORITIES, PRIORITY_INFO, Announcer
+from .broadcast import async_broadcast, expand_entity_ids, media_content_id
+from .cache_manager import PhraseCacheManager
+from .catalog import ClipCatalog
+from .compiler import TextCompiler
 from .const import (
     CACHE_DIR_NAME,
+    CACHE_PRUNE_INTERVAL,
+    CLIP_CATALOG_FILE,
+    CLIP_STORE_DIR_NAME,
     CONF_AUTO_FETCH_VOX,
+    CONF_AUTO_PHRASES_MAX,
+    CONF_BROWSE_AUTO_PHRASES,
+    CONF_CACHE_MAX_ENTRIES,
+    CONF_CACHE_MAX_MB,
+    CONF_CACHE_TTL_DAYS,
+    CONF_CLIP_STORE,
+    CONF_HOT_CACHE_MB,
+    CONF_OUTPUT_CODEC,
+    CONF_OUTPUT_PROFILES,
+    CONF_PERSIST_AUTO_PHRASES,
     CONF_PHRASES,
+    CONF_PREWARM,
+    CONF_RESAMPLE_QUALITY,
     CONF_SOUNDS_PATH,
+    CONF_VOX_SOURCE,
     DEFAULT_AUTO_FETCH_VOX,
+    DEFAULT_AUTO_PHRASES_MAX,
+    DEFAULT_BROWSE_AUTO_PHRASES,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CACHE_TTL_DAYS,
+    DEFAULT_CLIP_CACHE_MB,
+    DEFAULT_CLIP_STORE,
+    DEFAULT_HOT_CACHE_MB,
+    DEFAULT_OUTPUT_CODEC,
+    DEFAULT_PERSIST_AUTO_PHRASES,
+    DEFAULT_PREWARM,
+    DEFAULT_RESAMPLE_QUALITY,
     DEFAULT_SILENCE_MS,
     DOMAIN,
+    HL1_VOX_REPO_ZIP,
+    SIGNAL_CACHE_UPDATED,
 )
-from .download import ensure_vox_sounds
+from .clip_cache import ByteLru, ClipPcmCache
+from .clip_store import ClipStore
+from .download import async_repair_vox_sounds, ensure_vox_sounds
 from .http import HlVoxAudioView
+from .media import CODECS, RESAMPLE_QUALITIES
+from .metrics import Metrics
+from .phrases import AutoPhraseRegistry, get_phrase_clips, get_phrase_duration
+from .profiles import PROFILE_SCHEMA, async_profile_for_player
+from .render import PhraseBuilder
+
+LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = [Platform.SENSOR]
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -33,12 +93,57 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(
                     CONF_AUTO_FETCH_VOX, default=DEFAULT_AUTO_FETCH_VOX
                 ): cv.boolean,
+                vol.Optional(CONF_VOX_SOURCE, default=HL1_VOX_REPO_ZIP): cv.string,
+                vol.Optional(
+                    CONF_CLIP_STORE, default=DEFAULT_CLIP_STORE
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_HOT_CACHE_MB, default=DEFAULT_HOT_CACHE_MB
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CACHE_MAX_MB, default=DEFAULT_CACHE_MAX_MB
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CACHE_MAX_ENTRIES, default=DEFAULT_CACHE_MAX_ENTRIES
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CACHE_TTL_DAYS, default=DEFAULT_CACHE_TTL_DAYS
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_AUTO_PHRASES_MAX, default=DEFAULT_AUTO_PHRASES_MAX
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_PERSIST_AUTO_PHRASES, default=DEFAULT_PERSIST_AUTO_PHRASES
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_BROWSE_AUTO_PHRASES, default=DEFAULT_BROWSE_AUTO_PHRASES
+                ): cv.boolean,
+                vol.Optional(CONF_PREWARM, default=DEFAULT_PREWARM): cv.boolean,
+                vol.Optional(
+                    CONF_OUTPUT_CODEC, default=DEFAULT_OUTPUT_CODEC
+                ): vol.In(list(CODECS)),
+                vol.Optional(
+                    CONF_RESAMPLE_QUALITY, default=DEFAULT_RESAMPLE_QUALITY
+                ): vol.In(RESAMPLE_QUALITIES),
+                vol.Optional(CONF_OUTPUT_PROFILES, default={}): {
+                    cv.string: PROFILE_SCHEMA
+                },
             }
         )
     },
     extra=vol.ALLOW_EXTRA,
 )
 
+# Options shared by the play services (see broadcast.async_broadcast and
+# announcer.Announcer)
+BROADCAST_SCHEMA = {
+    vol.Optional("broadcast", default=False): cv.boolean,
+    vol.Optional("prerender", default=True): cv.boolean,
+    vol.Optional("queue", default=False): cv.boolean,
+    vol.Optional("priority", default=PRIORITY_INFO): vol.In(PRIORITIES),
+    vol.Optional("merge", default=False): cv.boolean,
+}
+
 
 def _phrase_id_from_clips(clips: list[str]) -> str:
     """Compute a stable phrase_id from a list of clip names."""
@@ -46,6 +151,71 @@ def _phrase_id_from_clips(clips: list[str]) -> str:
     return "auto_" + hashlib.sha256(canonical.encode()).hexdigest()[:12]
 
 
+def _apply_cache_limits(
+    manager: PhraseCacheManager, settings: Mapping[str, Any]
+) -> None:
+    """Set phrase cache limits from settings (defaults for missing keys)."""
+    manager.max_bytes = (
+        settings.get(CONF_CACHE_MAX_MB, DEFAULT_CACHE_MAX_MB) * 1024 * 1024
+    )
+    manager.max_entries = settings.get(CONF_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_ENTRIES)
+    manager.ttl_seconds = (
+        settings.get(CONF_CACHE_TTL_DAYS, DEFAULT_CACHE_TTL_DAYS) * 86400
+    )
+
+
+async def _async_prune_cache(hass: HomeAssistant) -> dict[str, int]:
+    """Enforce phrase cache limits and notify the cache size sensor."""
+    data = hass.data[DOMAIN]
+    manager: PhraseCacheManager = data["cache_manager"]
+    result = await hass.async_add_executor_job(manager.prune)
+    hot_phrases: ByteLru | None = data.get("hot_phrases")
+    if hot_phrases is not None:
+        for name in result.removed:
+            hot_phrases.pop(name)
+    async_dispatcher_send(hass, SIGNAL_CACHE_UPDATED)
+    return {
+        "removed": len(result.removed),
+        "removed_bytes": result.removed_bytes,
+        "entries": result.entries,
+        "bytes": result.total_bytes,
+    }
+
+
+@callback
+def _schedule_prewarm(hass: HomeAssistant) -> None:
+    """Pre-render all user-defined phrases in the background.
+
+    Waits until Home Assistant has started so it never delays startup.
+    """
+
+    @callback
+    def _async_start(_hass: HomeAssistant) -> None:
+        data = hass.data.get(DOMAIN)
+        if not data or not data.get("prewarm") or not data.get("phrases"):
+            return
+        hass.async_create_background_task(
+            data["builder"].async_prewarm(list(data["phrases"])),
+            f"{DOMAIN} prewarm",
+        )
+
+    async_at_started(hass, _async_start)
+
+
+@callback
+def _schedule_vox_repair(hass: HomeAssistant, sounds_path: Path, source: str) -> None:
+    """Re-extract missing or damaged clips in the background after startup."""
+
+    @callback
+    def _async_start(_hass: HomeAssistant) -> None:
+        hass.async_create_background_task(
+            async_repair_vox_sounds(hass, sounds_path, source),
+            f"{DOMAIN} VOX repair",
+        )
+
+    async_at_started(hass, _async_start)
+
+
 def _register_view_if_needed(hass: HomeAssistant) -> None:
     """Register the HTTP view once (idempotent)."""
     if getattr(HlVoxAudioView, "_registered", False):
@@ -54,48 +224,146 @@ def _register_view_if_needed(hass: HomeAssistant) -> None:
     HlVoxAudioView._registered = True
 
 
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up the HL VOX integration from YAML (when no config entry exists)."""
-    if hass.config_entries.async_entries(DOMAIN):
-        return True
-    conf = config.get(DOMAIN) or {}
-    sounds_path_str = conf.get(CONF_SOUNDS_PATH)
-    if sounds_path_str:
-        sounds_path = Path(sounds_path_str)
-    else:
-        sounds_path = Path(hass.config.config_dir) / "hl_vox" / "sounds"
-    auto_fetch = conf.get(CONF_AUTO_FETCH_VOX, DEFAULT_AUTO_FETCH_VOX)
-    phrases = {}
+async def _async_setup_domain(
+    hass: HomeAssistant,
+    sounds_path: Path,
+    auto_fetch: bool,
+    phrases: dict[str, list[str]],
+    settings: Mapping[str, Any],
+) -> None:
+    """Fetch sounds, populate hass.data and register the view and services.
+
+    settings holds the tunables, from YAML or from the config entry's data
+    and options; missing keys take their defaults.
+    """
     cache_dir = Path(hass.config.config_dir) / "hl_vox" / CACHE_DIR_NAME
     cache_dir.mkdir(parents=True, exist_ok=True)
 
-    await ensure_vox_sounds(hass, sounds_path, auto_fetch)
+    vox_source = settings.get(CONF_VOX_SOURCE, HL1_VOX_REPO_ZIP)
+    await ensure_vox_sounds(hass, sounds_path, auto_fetch, vox_source)
+
+    catalog = ClipCatalog(sounds_path, cache_dir.parent / CLIP_CATALOG_FILE)
+    await hass.async_add_executor_job(catalog.load)
+
+    quality = settings.get(CONF_RESAMPLE_QUALITY, DEFAULT_RESAMPLE_QUALITY)
+    metrics = Metrics()
+    clip_cache = ClipPcmCache(
+        DEFAULT_CLIP_CACHE_MB * 1024 * 1024, quality, metrics.record
+    )
+    clip_store = None
+    if settings.get(CONF_CLIP_STORE, DEFAULT_CLIP_STORE):
+        clip_store = ClipStore(
+            cache_dir.parent / CLIP_STORE_DIR_NAME,
+            sounds_path,
+            clip_cache.load,
+            quality,
+        )
+        await _async_load_clip_store(hass, clip_store)
+
+    cache_manager = PhraseCacheManager(cache_dir, 0, 0, 0)
+    _apply_cache_limits(cache_manager, settings)
+
+    persist_auto_phrases = settings.get(
+        CONF_PERSIST_AUTO_PHRASES, DEFAULT_PERSIST_AUTO_PHRASES
+    )
+    auto_phrases = AutoPhraseRegistry(
+        hass,
+        settings.get(CONF_AUTO_PHRASES_MAX, DEFAULT_AUTO_PHRASES_MAX),
+        persist_auto_phrases,
+    )
+    await auto_phrases.async_load()
 
     hass.data[DOMAIN] = {
         "phrases": phrases,
+        "auto_phrases": auto_phrases,
+        "persist_auto_phrases": persist_auto_phrases,
+        "browse_auto_phrases": settings.get(
+            CONF_BROWSE_AUTO_PHRASES, DEFAULT_BROWSE_AUTO_PHRASES
+        ),
         "sounds_path": sounds_path,
+        "catalog": catalog,
+        "compiler": TextCompiler(catalog),
         "cache_dir": cache_dir,
         "silence_ms": DEFAULT_SILENCE_MS,
+        "output_codec": settings.get(CONF_OUTPUT_CODEC, DEFAULT_OUTPUT_CODEC),
+        "output_profiles": settings.get(CONF_OUTPUT_PROFILES) or {},
+        "resample_quality": quality,
+        "clip_cache": clip_cache,
+        "clip_store": clip_store,
+        "builder": PhraseBuilder(hass),
+        "hot_phrases": ByteLru(
+            settings.get(CONF_HOT_CACHE_MB, DEFAULT_HOT_CACHE_MB) * 1024 * 1024
+        ),
+        "cache_manager": cache_manager,
+        "prewarm": settings.get(CONF_PREWARM, DEFAULT_PREWARM),
+        "announcer": Announcer(hass, lambda clips: _add_auto_phrase(hass, clips)),
+        "metrics": metrics,
     }
 
     _register_view_if_needed(hass)
+    if auto_fetch:
+        _schedule_vox_repair(hass, sounds_path, vox_source)
+
+    async def _async_prune_interval(_now=None) -> None:
+        await _async_refresh_catalog(hass, deep=True)
+        await _async_prune_cache(hass)
+
+    hass.async_create_background_task(
+        _async_prune_interval(), f"{DOMAIN} phrase cache prune"
+    )
+    hass.data[DOMAIN]["unsub_prune"] = async_track_time_interval(
+        hass, _async_prune_interval, CACHE_PRUNE_INTERVAL
+    )
+
+    async def prewarm(call: ServiceCall) -> ServiceResponse:
+        data = hass.data[DOMAIN]
+        phrase_ids = call.data.get("phrase_id") or list(data["phrases"])
+        return await data["builder"].async_prewarm(phrase_ids)
+
+    hass.services.async_register(
+        DOMAIN,
+        "prewarm",
+        prewarm,
+        schema=vol.Schema({vol.Optional("phrase_id"): vol.All(cv.ensure_list, [cv.string])}),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def prune_cache(call: ServiceCall) -> ServiceResponse:
+        return await _async_prune_cache(hass)
 
-    async def play_phrase(call: ServiceCall) -> None:
+    hass.services.async_register(
+        DOMAIN,
+        "prune_cache",
+        prune_cache,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    _schedule_prewarm(hass)
+
+    async def clip_info(call: ServiceCall) -> ServiceResponse:
+        catalog: ClipCatalog = hass.data[DOMAIN]["catalog"]
+        names = call.data.get("clips") or catalog.names()
+        clips = {}
+        missing = []
+        for name in names:
+            if (info := catalog.get(name)) is None:
+                missing.append(name)
+            else:
+                clips[name] = info.as_dict()
+        return {"clips": clips, "missing": missing}
+
+    hass.services.async_register(
+        DOMAIN,
+        "clip_info",
+        clip_info,
+        schema=vol.Schema({vol.Optional("clips"): vol.All(cv.ensure_list, [cv.string])}),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def play_phrase(call: ServiceCall) -> ServiceResponse:
         phrase_id = call.data["phrase_id"]
-        entity_id = call.data["entity_id"]
-        if isinstance(entity_id, str):
-            entity_id = [entity_id]
-        media_content_id = f"media-source://{DOMAIN}/{phrase_id}"
-        await hass.services.async_call(
-            "media_player",
-            "play_media",
-            {
-                "entity_id": entity_id,
-                "media_content_id": media_content_id,
-                "media_content_type": "audio/wav",
-            },
-            blocking=True,
-        )
+        played = await _async_play_phrase(hass, phrase_id, call)
+        return {**await _async_phrase_timing(hass, phrase_id), **played}
 
     hass.services.async_register(
         DOMAIN,
@@ -105,32 +373,19 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
             {
                 vol.Required("phrase_id"): cv.string,
                 vol.Required("entity_id"): cv.comp_entity_ids,
+                **BROADCAST_SCHEMA,
             }
         ),
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
-    async def play_clips(call: ServiceCall) -> None:
+    async def play_clips(call: ServiceCall) -> ServiceResponse:
         clips = call.data.get("clips") or []
         if not clips:
-            return
-        phrase_id = _phrase_id_from_clips(clips)
-        data = hass.data.get(DOMAIN)
-        if data is not None:
-            data.setdefault("phrases", {})[phrase_id] = list(clips)
-        entity_id = call.data["entity_id"]
-        if isinstance(entity_id, str):
-            entity_id = [entity_id]
-        media_content_id = f"media-source://{DOMAIN}/{phrase_id}"
-        await hass.services.async_call(
-            "media_player",
-            "play_media",
-            {
-                "entity_id": entity_id,
-                "media_content_id": media_content_id,
-                "media_content_type": "audio/wav",
-            },
-            blocking=True,
-        )
+            return {"phrase_id": None, "duration": 0.0}
+        phrase_id = _add_auto_phrase(hass, clips)
+        played = await _async_play_phrase(hass, phrase_id, call)
+        return {**await _async_phrase_timing(hass, phrase_id), **played}
 
     hass.services.async_register(
         DOMAIN,
@@ -140,34 +395,240 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
             {
                 vol.Required("entity_id"): cv.comp_entity_ids,
                 vol.Required("clips"): [cv.string],
+                **BROADCAST_SCHEMA,
             }
         ),
+        supports_response=SupportsResponse.OPTIONAL,
     )
-    return True
 
+    async def say(call: ServiceCall) -> ServiceResponse:
+        text = call.data["text"]
+        compiled = hass.data[DOMAIN]["compiler"].compile(text)
+        if compiled.unknown:
+            LOGGER.warning(
+                "No VOX clips for: %s (in %r)", ", ".join(compiled.unknown), text
+            )
+        if not compiled.clips:
+            raise HomeAssistantError(f"No VOX clips match any word of {text!r}")
+        phrase_id = _add_auto_phrase(hass, list(compiled.clips))
+        played = await _async_play_phrase(hass, phrase_id, call)
+        return {
+            **await _async_phrase_timing(hass, phrase_id),
+            **played,
+            "clips": list(compiled.clips),
+            "unknown": list(compiled.unknown),
+        }
 
-def _clear_phrase_cache(cache_dir: Path, phrase_ids: list[str] | None = None) -> None:
-    """Remove cached WAV files. If phrase_ids is None, clear all."""
-    if not cache_dir.is_dir():
+    hass.services.async_register(
+        DOMAIN,
+        "say",
+        say,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.comp_entity_ids,
+                vol.Required("text"): cv.string,
+                **BROADCAST_SCHEMA,
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _add_auto_phrase(hass: HomeAssistant, clips: list[str]) -> str:
+    """Register an ad-hoc clip list as an auto phrase and return its ID."""
+    phrase_id = _phrase_id_from_clips(clips)
+    data = hass.data.get(DOMAIN)
+    if data is not None:
+        data["auto_phrases"].add(phrase_id, list(clips))
+    return phrase_id
+
+
+async def _async_play_phrase(
+    hass: HomeAssistant, phrase_id: str, call: ServiceCall
+) -> dict[str, Any]:
+    """Play a phrase's media source URL on the call's media players.
+
+    With queue, the phrase is added to each player's announcement queue
+    and the positions are returned; with broadcast, see async_broadcast.
+    Either way the extra data is merged into the service response. Otherwise
+    the players are sent play_media with the MIME type of their output
+    profile.
+    """
+    entity_id = call.data["entity_id"]
+    if isinstance(entity_id, str):
+        entity_id = [entity_id]
+    if call.data.get("queue"):
+        announcer: Announcer = hass.data[DOMAIN]["announcer"]
+        clips = get_phrase_clips(hass.data[DOMAIN], phrase_id)
+        if clips is None:
+            raise HomeAssistantError(f"Unknown phrase: {phrase_id}")
+        return {
+            "queue": {
+                player: announcer.async_enqueue(
+                    player,
+                    phrase_id,
+                    clips,
+                    call.data.get("priority", PRIORITY_INFO),
+                    call.data.get("merge", False),
+                )
+                for player in expand_entity_ids(hass, entity_id)
+            }
+        }
+    if call.data.get("broadcast"):
+        return {
+            "broadcast": await async_broadcast(
+                hass, phrase_id, entity_id, call.data.get("prerender", True)
+            )
+        }
+    # One play_media call per content type, so each player is told the
+    # format its output profile will serve
+    data = hass.data[DOMAIN]
+    by_type: dict[str, list[str]] = {}
+    for player in expand_entity_ids(hass, entity_id):
+        profile = async_profile_for_player(
+            hass,
+            data.get("output_profiles") or {},
+            player,
+            data.get("output_codec", DEFAULT_OUTPUT_CODEC),
+        )
+        by_type.setdefault(profile.output.content_type, []).append(player)
+    content_id = media_content_id(phrase_id)
+    await asyncio.gather(
+        *(
+            hass.services.async_call(
+                "media_player",
+                "play_media",
+                {
+                    "entity_id": players,
+                    "media_content_id": content_id,
+                    "media_content_type": content_type,
+                },
+                blocking=True,
+            )
+            for content_type, players in by_type.items()
+        )
+    )
+    return {}
+
+
+async def _async_phrase_timing(hass: HomeAssistant, phrase_id: str) -> dict[str, Any]:
+    """Response data for the play services: the phrase ID and its duration.
+
+    The duration (seconds) comes from the clip catalog, so automations can
+    wait exactly as long as the announcement plays; None if a clip is missing.
+    """
+    data = hass.data[DOMAIN]
+    duration = get_phrase_duration(data, phrase_id)
+    if duration is None and get_phrase_clips(data, phrase_id) is not None:
+        # Clips may have been added since the catalog was last refreshed
+        await _async_refresh_catalog(hass)
+        duration = get_phrase_duration(data, phrase_id)
+    return {
+        "phrase_id": phrase_id,
+        "duration": None if duration is None else round(duration, 3),
+    }
+
+
+async def _async_refresh_catalog(hass: HomeAssistant, deep: bool = False) -> None:
+    """Rescan the sounds directory if it changed since the last refresh.
+
+    With deep, clips overwritten in place are found too (see
+    ClipCatalog.refresh). When clips changed, the clip store is brought up
+    to date in the background.
+    """
+    data = hass.data.get(DOMAIN)
+    if not data:
+        return
+    try:
+        changed = await hass.async_add_executor_job(data["catalog"].refresh, deep)
+    except OSError as err:
+        LOGGER.warning("Could not refresh clip catalog: %s", err)
         return
-    if phrase_ids is not None:
-        for pid in phrase_ids:
-            (cache_dir / f"{pid}.wav").unlink(missing_ok=True)
+    if changed and (clip_store := data.get("clip_store")):
+        hass.async_create_background_task(
+            _async_build_clip_store(hass, clip_store), f"{DOMAIN} clip store build"
+        )
+
+
+async def _async_load_clip_store(hass: HomeAssistant, clip_store: ClipStore) -> None:
+    """Map the persisted clip store now and refresh it in the background.
+
+    Until the refresh finishes, clips missing from the store are decoded on
+    demand, so startup is never blocked on normalizing the library.
+    """
+    try:
+        await hass.async_add_executor_job(clip_store.load)
+    except OSError as err:
+        LOGGER.warning("Could not load clip store: %s", err)
+
+    hass.async_create_background_task(
+        _async_build_clip_store(hass, clip_store), f"{DOMAIN} clip store build"
+    )
+
+
+async def _async_build_clip_store(hass: HomeAssistant, clip_store: ClipStore) -> None:
+    try:
+        await hass.async_add_executor_job(clip_store.build)
+    except OSError as err:
+        LOGGER.warning("Could not build clip store: %s", err)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Set up the HL VOX integration from YAML (when no config entry exists)."""
+    if hass.config_entries.async_entries(DOMAIN):
+        return True
+    conf = config.get(DOMAIN) or {}
+    sounds_path_str = conf.get(CONF_SOUNDS_PATH)
+    if sounds_path_str:
+        sounds_path = Path(sounds_path_str)
     else:
-        for f in cache_dir.glob("*.wav"):
-            f.unlink(missing_ok=True)
+        sounds_path = Path(hass.config.config_dir) / "hl_vox" / "sounds"
+    auto_fetch = conf.get(CONF_AUTO_FETCH_VOX, DEFAULT_AUTO_FETCH_VOX)
+    await _async_setup_domain(hass, sounds_path, auto_fetch, {}, conf)
+    return True
 
 
 async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update hass.data phrases and invalidate phrase cache when options change."""
+    """Apply changed options to hass.data.
+
+    Cached renders need no invalidation: they are keyed by content, so an
+    edited phrase resolves to a new key and the old render ages out. A new
+    resampling quality (which renormalizes the clip store) or auto-phrase
+    persistence (which opens or drops the store) reloads the entry instead.
+    """
     data = hass.data.get(DOMAIN)
     if not data:
         return
+    if entry.options.get(
+        CONF_RESAMPLE_QUALITY, DEFAULT_RESAMPLE_QUALITY
+    ) != data.get("resample_quality") or entry.options.get(
+        CONF_PERSIST_AUTO_PHRASES, DEFAULT_PERSIST_AUTO_PHRASES
+    ) != data.get("persist_auto_phrases"):
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
     new_phrases = entry.options.get(CONF_PHRASES) or {}
     data["phrases"] = new_phrases
-    cache_dir: Path | None = data.get("cache_dir")
-    if cache_dir:
-        _clear_phrase_cache(cache_dir, list(new_phrases.keys()))
+    hot_phrases: ByteLru | None = data.get("hot_phrases")
+    if hot_phrases is not None:
+        hot_phrases.resize(
+            entry.options.get(CONF_HOT_CACHE_MB, DEFAULT_HOT_CACHE_MB) * 1024 * 1024
+        )
+    cache_manager: PhraseCacheManager | None = data.get("cache_manager")
+    if cache_manager is not None:
+        _apply_cache_limits(cache_manager, entry.options)
+    auto_phrases: AutoPhraseRegistry = data["auto_phrases"]
+    auto_phrases.resize(
+        entry.options.get(CONF_AUTO_PHRASES_MAX, DEFAULT_AUTO_PHRASES_MAX)
+    )
+    data["browse_auto_phrases"] = entry.options.get(
+        CONF_BROWSE_AUTO_PHRASES, DEFAULT_BROWSE_AUTO_PHRASES
+    )
+    data["prewarm"] = entry.options.get(CONF_PREWARM, DEFAULT_PREWARM)
+    data["output_codec"] = entry.options.get(CONF_OUTPUT_CODEC, DEFAULT_OUTPUT_CODEC)
+    data["output_profiles"] = entry.options.get(CONF_OUTPUT_PROFILES) or {}
+    if cache_manager is not None:
+        await _async_prune_cache(hass)
+    _schedule_prewarm(hass)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -177,89 +638,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         sounds_path = Path(hass.config.config_dir) / "hl_vox" / "sounds"
     auto_fetch = entry.data.get(CONF_AUTO_FETCH_VOX, DEFAULT_AUTO_FETCH_VOX)
     phrases = entry.options.get(CONF_PHRASES) or {}
-    cache_dir = Path(hass.config.config_dir) / "hl_vox" / CACHE_DIR_NAME
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
-    await ensure_vox_sounds(hass, sounds_path, auto_fetch)
-
-    hass.data[DOMAIN] = {
-        "phrases": phrases,
-        "sounds_path": sounds_path,
-        "cache_dir": cache_dir,
-        "silence_ms": DEFAULT_SILENCE_MS,
-    }
-
-    entry.add_update_listener(_async_options_updated)
-    _register_view_if_needed(hass)
-
-    async def play_phrase(call: ServiceCall) -> None:
-        phrase_id = call.data["phrase_id"]
-        entity_id = call.data["entity_id"]
-        if isinstance(entity_id, str):
-            entity_id = [entity_id]
-        media_content_id = f"media-source://{DOMAIN}/{phrase_id}"
-        await hass.services.async_call(
-            "media_player",
-            "play_media",
-            {
-                "entity_id": entity_id,
-                "media_content_id": media_content_id,
-                "media_content_type": "audio/wav",
-            },
-            blocking=True,
-        )
-
-    hass.services.async_register(
-        DOMAIN,
-        "play_phrase",
-        play_phrase,
-        schema=vol.Schema(
-            {
-                vol.Required("phrase_id"): cv.string,
-                vol.Required("entity_id"): cv.comp_entity_ids,
-            }
-        ),
-    )
-
-    async def play_clips(call: ServiceCall) -> None:
-        clips = call.data.get("clips") or []
-        if not clips:
-            return
-        phrase_id = _phrase_id_from_clips(clips)
-        data = hass.data.get(DOMAIN)
-        if data is not None:
-            data.setdefault("phrases", {})[phrase_id] = list(clips)
-        entity_id = call.data["entity_id"]
-        if isinstance(entity_id, str):
-            entity_id = [entity_id]
-        media_content_id = f"media-source://{DOMAIN}/{phrase_id}"
-        await hass.services.async_call(
-            "media_player",
-            "play_media",
-            {
-                "entity_id": entity_id,
-                "media_content_id": media_content_id,
-                "media_content_type": "audio/wav",
-            },
-            blocking=True,
-        )
-
-    hass.services.async_register(
-        DOMAIN,
-        "play_clips",
-        play_clips,
-        schema=vol.Schema(
-            {
-                vol.Required("entity_id"): cv.comp_entity_ids,
-                vol.Required("clips"): [cv.string],
-            }
-        ),
-    )
+    settings = {**entry.data, **entry.options}
+    await _async_setup_domain(hass, sounds_path, auto_fetch, phrases, settings)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
     if DOMAIN in hass.data:
-        del hass.data[DOMAIN]
+        data = hass.data.pop(DOMAIN)
+        if unsub_prune := data.get("unsub_prune"):
+            unsub_prune()
+        if announcer := data.get("announcer"):
+            announcer.async_stop()
     return True
@@ -0,0 +1,295 @@
+"""Per-player announcement queues: priorities, coalescing, back-to-back play."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .broadcast import async_play_media, media_content_id
+from .const import (
+    DOMAIN,
+    QUEUE_COALESCE_SECONDS,
+    QUEUE_GAP_SECONDS,
+    SIGNAL_QUEUE_UPDATED,
+)
+from .media import CODEC_PCM16
+from .phrases import get_phrase_duration
+from .profiles import async_profile_for_player
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITY_INFO = "info"
+PRIORITY_ALARM = "alarm"
+# Lowest first; a higher priority jumps the queue and cuts a lower one short
+PRIORITIES = (PRIORITY_INFO, PRIORITY_ALARM)
+
+
+@dataclass(slots=True)
+class Announcement:
+    """A phrase waiting in (or playing from) a player's queue."""
+
+    phrase_id: str
+    clips: tuple[str, ...]
+    priority: int
+    merge: bool
+    queued_at: float = field(default_factory=time.monotonic)
+    duration: float | None = None
+
+
+class PlayerQueue:
+    """Announcements for one media player, played one after another.
+
+    A worker task runs while the queue is not empty. Each announcement is
+    started with play_media and the next one follows after its duration
+    (from the clip catalog) plus QUEUE_GAP_SECONDS, so phrases neither
+    interrupt each other nor leave the player idle. A queued announcement
+    of higher priority than the one playing cuts it short.
+    """
+
+    def __init__(self, announcer: Announcer, entity_id: str) -> None:
+        self.announcer = announcer
+        self.entity_id = entity_id
+        self.items: list[Announcement] = []
+        self.current: Announcement | None = None
+        self.current_ends = 0.0
+        self.played = 0
+        self.coalesced = 0
+        self._preempt = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def _remaining(self, now: float) -> float:
+        """Seconds until the next announcement can start.
+
+        0 if idle, or if the next one is about to cut the current one short.
+        """
+        current = self.current
+        if current is None or (
+            self.items and self.items[0].priority > current.priority
+        ):
+            return 0.0
+        return max(self.current_ends - now, 0.0)
+
+    def wait_before(self, index: int, now: float) -> float:
+        """Estimated seconds until the item at index starts playing."""
+        return self._remaining(now) + sum(
+            (item.duration or 0.0) + QUEUE_GAP_SECONDS for item in self.items[:index]
+        )
+
+    def _index_for(self, priority: int) -> int:
+        """Queue position for a new item: after all of equal or higher priority."""
+        for index, item in enumerate(self.items):
+            if item.priority < priority:
+                return index
+        return len(self.items)
+
+    @callback
+    def add(self, item: Announcement) -> dict[str, Any]:
+        """Queue item unless the same phrase was queued within the window.
+
+        Return its position (0 = next), the estimated wait in seconds and
+        whether it was coalesced into an announcement already queued or
+        playing; a coalesced duplicate of higher priority promotes the
+        queued one.
+        """
+        now = item.queued_at
+        for index, queued in enumerate(self.items):
+            if (
+                queued.clips == item.clips
+                and now - queued.queued_at <= QUEUE_COALESCE_SECONDS
+            ):
+                self.coalesced += 1
+                if item.priority > queued.priority:
+                    del self.items[index]
+                    queued.priority = item.priority
+                    index = self._index_for(queued.priority)
+                    self.items.insert(index, queued)
+                    self._maybe_preempt(queued)
+                self._changed()
+                return self._position(index, now, coalesced=True)
+        current = self.current
+        if (
+            current is not None
+            and current.clips == item.clips
+            and now - current.queued_at <= QUEUE_COALESCE_SECONDS
+        ):
+            self.coalesced += 1
+            return {"position": 0, "wait": 0.0, "coalesced": True}
+        index = self._index_for(item.priority)
+        self.items.insert(index, item)
+        self._maybe_preempt(item)
+        if self._task is None:
+            self._task = self.announcer.hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN} queue {self.entity_id}"
+            )
+        self._changed()
+        return self._position(index, now, coalesced=False)
+
+    def _position(self, index: int, now: float, coalesced: bool) -> dict[str, Any]:
+        return {
+            "position": index,
+            "wait": round(self.wait_before(index, now), 3),
+            "coalesced": coalesced,
+        }
+
+    def _maybe_preempt(self, item: Announcement) -> None:
+        if self.current is not None and item.priority > self.current.priority:
+            self._preempt.set()
+
+    def _pop(self) -> Announcement:
+        """Take the next announcement, merged with mergeable ones behind it."""
+        item = self.items.pop(0)
+        if not item.merge:
+            return item
+        merged = [item]
+        while (
+            self.items
+            and self.items[0].merge
+            and self.items[0].priority == item.priority
+        ):
+            merged.append(self.items.pop(0))
+        if len(merged) == 1:
+            return item
+        clips = tuple(clip for part in merged for clip in part.clips)
+        return Announcement(
+            self.announcer.add_phrase(list(clips)),
+            clips,
+            item.priority,
+            True,
+            item.queued_at,
+            None,
+        )
+
+    async def _async_run(self) -> None:
+        try:
+            while self.items:
+                item = self._pop()
+                self.current = item
+                self._preempt.clear()
+                data = self.announcer.hass.data[DOMAIN]
+                duration = get_phrase_duration(data, item.phrase_id)
+                item.duration = duration
+                self.current_ends = time.monotonic() + (duration or 0.0)
+                self._changed()
+                try:
+                    await self.announcer.async_play(self.entity_id, item.phrase_id)
+                except Exception as err:  # noqa: BLE001 - keep the queue going
+                    LOGGER.warning(
+                        "Failed to play queued %s on %s: %s",
+                        item.phrase_id,
+                        self.entity_id,
+                        err,
+                    )
+                    continue
+                self.played += 1
+                self.current_ends = (
+                    time.monotonic() + (duration or 0.0) + QUEUE_GAP_SECONDS
+                )
+                self._changed()
+                try:
+                    async with asyncio.timeout(self._remaining(time.monotonic())):
+                        await self._preempt.wait()
+                except TimeoutError:
+                    pass
+        finally:
+            self.current = None
+            self._task = None
+            self._changed()
+
+    @callback
+    def _changed(self) -> None:
+        async_dispatcher_send(self.announcer.hass, SIGNAL_QUEUE_UPDATED)
+
+    def stop(self) -> None:
+        """Drop queued announcements and stop the worker."""
+        self.items.clear()
+        if self._task is not None:
+            self._task.cancel()
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Queue state for the sensor attributes."""
+        return {
+            "depth": len(self.items),
+            "playing": self.current.phrase_id if self.current else None,
+            "wait": round(self.wait_before(len(self.items), now), 3),
+            "oldest_wait": round(now - self.items[0].queued_at, 3)
+            if self.items
+            else 0.0,
+            "played": self.played,
+            "coalesced": self.coalesced,
+        }
+
+
+class Announcer:
+    """The announcement queues of all media players.
+
+    add_phrase registers a clip list as a phrase and returns its ID; it is
+    used to merge queued announcements into one phrase, which is rendered
+    once and fetched by the player in one request.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, add_phrase: Callable[[list[str]], str]
+    ) -> None:
+        self.hass = hass
+        self.add_phrase = add_phrase
+        self._queues: dict[str, PlayerQueue] = {}
+
+    @callback
+    def async_enqueue(
+        self,
+        entity_id: str,
+        phrase_id: str,
+        clips: list[str],
+        priority: str = PRIORITY_INFO,
+        merge: bool = False,
+    ) -> dict[str, Any]:
+        """Queue a phrase on a media player; see PlayerQueue.add."""
+        queue = self._queues.get(entity_id)
+        if queue is None:
+            queue = self._queues[entity_id] = PlayerQueue(self, entity_id)
+        item = Announcement(
+            phrase_id, tuple(clips), PRIORITIES.index(priority), merge
+        )
+        item.duration = get_phrase_duration(self.hass.data[DOMAIN], phrase_id)
+        return queue.add(item)
+
+    async def async_play(self, entity_id: str, phrase_id: str) -> None:
+        """Start a phrase on one player, in that player's output format."""
+        data = self.hass.data[DOMAIN]
+        profile = async_profile_for_player(
+            self.hass,
+            data.get("output_profiles") or {},
+            entity_id,
+            data.get("output_codec", CODEC_PCM16),
+        )
+        await async_play_media(
+            self.hass,
+            entity_id,
+            media_content_id(phrase_id),
+            profile.output.content_type,
+        )
+
+    @property
+    def depth(self) -> int:
+        """Announcements waiting on all players."""
+        return sum(len(queue.items) for queue in self._queues.values())
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Per-player queue state, for players that have used the queue."""
+        now = time.monotonic()
+        return {
+            entity_id: queue.as_dict(now) for entity_id, queue in self._queues.items()
+        }
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop all queues (on unload)."""
+        for queue in self._queues.values():
+            queue.stop()
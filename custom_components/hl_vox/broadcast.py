@@ -0,0 +1,155 @@
+"""Broadcast a phrase to several media players at once."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from homeassistant.const import ENTITY_MATCH_ALL
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+from .media import CODEC_PCM16, OutputProfile
+from .phrases import get_phrase_clips
+from .profiles import async_profile_for_player
+from .render import BUILD_ERRORS, MissingClipError, read_cached_phrase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def media_content_id(phrase_id: str) -> str:
+    """Media source ID of a phrase."""
+    return f"media-source://{DOMAIN}/{phrase_id}"
+
+
+def expand_entity_ids(hass: HomeAssistant, entity_ids: list[str]) -> list[str]:
+    """Resolve "all" to every media player; drop duplicates, keep order."""
+    if ENTITY_MATCH_ALL in entity_ids:
+        return hass.states.async_entity_ids("media_player")
+    return list(dict.fromkeys(entity_ids))
+
+
+async def _async_prerender(
+    hass: HomeAssistant, clip_names: list[str], profiles: set[OutputProfile]
+) -> None:
+    """Render the phrase once per distinct profile and load it into RAM.
+
+    A render that was already on disk is read into the hot-phrase cache, so
+    the players' simultaneous fetches are all served from memory.
+    """
+    data = hass.data[DOMAIN]
+    builder = data["builder"]
+    hot_phrases = data.get("hot_phrases")
+
+    async def _prerender_one(profile: OutputProfile) -> None:
+        cache_path, built = await builder.async_render(clip_names, profile)
+        key = cache_path.stem
+        if built or not hot_phrases or hot_phrases.get(key) is not None:
+            return
+        phrase = await hass.async_add_executor_job(
+            read_cached_phrase,
+            cache_path,
+            hot_phrases.max_bytes,
+            profile.output.content_type,
+        )
+        if phrase is not None:
+            hot_phrases.put(key, phrase, len(phrase.body))
+
+    try:
+        await asyncio.gather(*(_prerender_one(p) for p in profiles))
+    except (MissingClipError, *BUILD_ERRORS) as err:
+        raise HomeAssistantError(f"Failed to render phrase: {err}") from err
+
+
+async def async_play_media(
+    hass: HomeAssistant, entity_id: str, content_id: str, content_type: str
+) -> float:
+    """Start playback on one player; return how long the call took (s)."""
+    start = time.monotonic()
+    await hass.services.async_call(
+        "media_player",
+        "play_media",
+        {
+            "entity_id": entity_id,
+            "media_content_id": content_id,
+            "media_content_type": content_type,
+        },
+        blocking=True,
+    )
+    return time.monotonic() - start
+
+
+async def async_broadcast(
+    hass: HomeAssistant,
+    phrase_id: str,
+    entity_ids: list[str],
+    prerender: bool = True,
+) -> dict[str, Any]:
+    """Play a phrase on all entity_ids together.
+
+    With prerender, the phrase is first rendered once for each output
+    profile among the players, so no speaker waits on a build and they
+    start close together. Then one play_media call per player is sent in
+    parallel (rather than one call for all of them, which most media player
+    integrations work through one entity at a time). Returns the render
+    time, and per entity the dispatch latency in seconds or the error; a
+    failure on some players does not stop the others, but raises if every
+    player failed.
+    """
+    data = hass.data[DOMAIN]
+    clip_names = get_phrase_clips(data, phrase_id)
+    if clip_names is None:
+        raise HomeAssistantError(f"Unknown phrase: {phrase_id}")
+    entity_ids = expand_entity_ids(hass, entity_ids)
+    default_codec = data.get("output_codec", CODEC_PCM16)
+    profiles = {
+        entity_id: async_profile_for_player(
+            hass, data.get("output_profiles") or {}, entity_id, default_codec
+        )
+        for entity_id in entity_ids
+    }
+    start = time.monotonic()
+    if prerender:
+        await _async_prerender(hass, clip_names, set(profiles.values()))
+    render_time = time.monotonic() - start
+
+    content_id = media_content_id(phrase_id)
+    results = await asyncio.gather(
+        *(
+            async_play_media(
+                hass, entity_id, content_id, profiles[entity_id].output.content_type
+            )
+            for entity_id in entity_ids
+        ),
+        return_exceptions=True,
+    )
+    latency: dict[str, float] = {}
+    errors: dict[str, str] = {}
+    for entity_id, result in zip(entity_ids, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            LOGGER.warning("Failed to play %s on %s: %s", phrase_id, entity_id, result)
+            errors[entity_id] = str(result) or type(result).__name__
+        else:
+            latency[entity_id] = round(result, 3)
+    if errors and not latency:
+        raise HomeAssistantError(
+            f"Failed to play {phrase_id} on any player: "
+            + "; ".join(f"{e}: {msg}" for e, msg in errors.items())
+        )
+    LOGGER.debug(
+        "Broadcast %s to %d players (render %.3f s): %s",
+        phrase_id,
+        len(entity_ids),
+        render_time,
+        latency,
+    )
+    return {
+        "render_time": round(render_time, 3),
+        "latency": latency,
+        "errors": errors,
+    }
@@ -0,0 +1,126 @@
+"""Size, count and age limits for the phrase cache directory."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .media import CODECS
+
+LOGGER = logging.getLogger(__name__)
+
+# Leftover temp files from interrupted builds are removed after this long
+PART_FILE_MAX_AGE = 3600
+# File suffixes of cached phrases, one per output codec container
+CACHE_SUFFIXES = frozenset(f".{codec.extension}" for codec in CODECS.values())
+
+
+@dataclass(slots=True)
+class PruneResult:
+    """Outcome of one prune pass."""
+
+    removed: list[str]
+    removed_bytes: int
+    entries: int
+    total_bytes: int
+
+
+class PhraseCacheManager:
+    """Evict cached phrase WAVs by TTL, then least-recently-used first.
+
+    Access times are tracked in memory (HA boxes usually mount with relatime
+    or noatime, and writing atimes to an SD card is what we want to avoid);
+    after a restart the file's atime/mtime is used until the phrase is
+    played again. A limit of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int,
+        max_entries: int,
+        ttl_seconds: float,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._access: dict[str, float] = {}
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> int:
+        """Number of cached phrase files as of the last scan or build."""
+        return len(self._sizes)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of cached phrase files as of the last scan or build."""
+        return sum(self._sizes.values())
+
+    def touch(self, name: str) -> None:
+        """Record that a cached phrase was served."""
+        self._access[name] = time.time()
+
+    def record_build(self, name: str, size: int) -> None:
+        """Record a newly written cache file."""
+        with self._lock:
+            self._sizes[name] = size
+        self.touch(name)
+
+    def prune(self) -> PruneResult:
+        """Scan the cache dir and delete what exceeds the limits (blocking)."""
+        now = time.time()
+        files: list[tuple[float, str, Path, int]] = []
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.iterdir():
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.suffix == ".part":
+                    if now - st.st_mtime > PART_FILE_MAX_AGE:
+                        path.unlink(missing_ok=True)
+                    continue
+                if path.suffix not in CACHE_SUFFIXES:
+                    continue
+                last = max(
+                    self._access.get(path.stem, 0.0), st.st_atime, st.st_mtime
+                )
+                files.append((last, path.stem, path, st.st_size))
+        files.sort()
+
+        removed: list[str] = []
+        removed_bytes = 0
+        total = sum(f[3] for f in files)
+        count = len(files)
+        for last, name, path, size in files:
+            expired = self.ttl_seconds and now - last > self.ttl_seconds
+            too_many = self.max_entries and count > self.max_entries
+            too_big = self.max_bytes and total > self.max_bytes
+            if not (expired or too_many or too_big):
+                continue
+            path.unlink(missing_ok=True)
+            removed.append(name)
+            removed_bytes += size
+            total -= size
+            count -= 1
+
+        removed_names = set(removed)
+        with self._lock:
+            self._sizes = {f[1]: f[3] for f in files if f[1] not in removed_names}
+        for name in removed:
+            self._access.pop(name, None)
+        if removed:
+            LOGGER.debug(
+                "Pruned %d cached phrases (%d bytes); %d left (%d bytes)",
+                len(removed),
+                removed_bytes,
+                count,
+                total,
+            )
+        return PruneResult(removed, removed_bytes, count, total)
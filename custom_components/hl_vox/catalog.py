@@ -0,0 +1,262 @@
+"""Catalog of the clips in a sounds directory, with their WAV metadata."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+
+from .media import TARGET_FRAMERATE, normalized_frame_count, silence_frame_count
+
+LOGGER = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ClipInfo:
+    """A clip in the sounds directory and its format, read from the WAV header."""
+
+    stem: str
+    path: Path
+    rate: int
+    width: int
+    channels: int
+    frames: int
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return self.frames / self.rate if self.rate else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "duration": round(self.duration, 3),
+            "rate": self.rate,
+            "width": self.width,
+            "channels": self.channels,
+            "frames": self.frames,
+        }
+
+
+def _read_header(path: Path) -> tuple[int, int, int, int]:
+    """Return (rate, width, channels, frames) of a WAV file."""
+    with contextlib.closing(wave.open(str(path), "rb")) as w:
+        return w.getframerate(), w.getsampwidth(), w.getnchannels(), w.getnframes()
+
+
+class ClipCatalog:
+    """Stem -> ClipInfo for every WAV in a sounds directory, persisted to disk.
+
+    The index file stores each clip's header fields with its mtime/size and
+    the directory's mtime. refresh() is a single stat when the directory has
+    not changed; otherwise it rescans and reads headers only for clips that
+    are new or modified. revalidate() stats just the clips of one phrase, to
+    catch a clip overwritten in place. Lookups never touch the filesystem.
+    Each clip's mtime/size doubles as its content fingerprint in phrase
+    cache keys.
+    """
+
+    def __init__(self, sounds_path: Path, index_path: Path) -> None:
+        self.sounds_path = sounds_path
+        self.index_path = index_path
+        self._dir_mtime_ns: int | None = None
+        # stem -> (mtime_ns, size, ClipInfo); replaced as a whole on refresh
+        self._clips: dict[str, tuple[int, int, ClipInfo]] = {}
+        # Serializes refreshes from the scheduled scan and lookup misses
+        self._refresh_lock = threading.Lock()
+        # Bumped whenever the set of clips changes, for derived indexes
+        self.generation = 0
+
+    def load(self) -> bool:
+        """Read the persisted catalog (blocking). Return True if usable."""
+        try:
+            index = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return False
+        if (
+            index.get("version") != CATALOG_VERSION
+            or index.get("sounds_path") != str(self.sounds_path)
+        ):
+            return False
+        self._clips = {
+            stem: (
+                mtime_ns,
+                size,
+                ClipInfo(stem, self.sounds_path / f"{stem}.wav", *header),
+            )
+            for stem, (mtime_ns, size, *header) in index.get("clips", {}).items()
+        }
+        self._dir_mtime_ns = index.get("dir_mtime_ns")
+        self.generation += 1
+        return True
+
+    def refresh(self, deep: bool = False) -> bool:
+        """Bring the catalog up to date with the sounds directory (blocking).
+
+        Adding, removing or renaming clips changes the directory's mtime;
+        a clip overwritten in place does not, so deep stats every clip even
+        if the directory looks unchanged. Return True if it changed.
+        """
+        with self._refresh_lock:
+            return self._refresh(deep)
+
+    def _refresh(self, deep: bool) -> bool:
+        try:
+            dir_mtime_ns = self.sounds_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime_ns = None
+        if (
+            not deep
+            and dir_mtime_ns is not None
+            and dir_mtime_ns == self._dir_mtime_ns
+        ):
+            return False
+
+        old = self._clips
+        clips: dict[str, tuple[int, int, ClipInfo]] = {}
+        if dir_mtime_ns is not None:
+            with os.scandir(self.sounds_path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".wav") or not entry.is_file():
+                        continue
+                    stem = entry.name[:-4]
+                    st = entry.stat()
+                    prev = old.get(stem)
+                    if prev is not None and prev[:2] == (st.st_mtime_ns, st.st_size):
+                        clips[stem] = prev
+                        continue
+                    path = Path(entry.path)
+                    try:
+                        header = _read_header(path)
+                    except (wave.Error, EOFError, OSError) as err:
+                        LOGGER.warning("Skipping unreadable clip %s: %s", path, err)
+                        continue
+                    clips[stem] = (
+                        st.st_mtime_ns,
+                        st.st_size,
+                        ClipInfo(stem, path, *header),
+                    )
+        changed = clips != old
+        if not changed and dir_mtime_ns == self._dir_mtime_ns:
+            return False
+        self._clips = clips
+        self._dir_mtime_ns = dir_mtime_ns
+        self._save()
+        if changed:
+            self.generation += 1
+            LOGGER.debug("Clip catalog updated: %d clips", len(clips))
+        return changed
+
+    def revalidate(self, stems: list[str]) -> bool:
+        """Re-stat the given clips and update any that changed (blocking).
+
+        Overwriting a clip in place does not change the directory's mtime,
+        so refresh() misses it until the next deep refresh; the request
+        path calls this for the clips of the phrase it is about to key.
+        Clips not in the catalog are ignored. Return True if any changed.
+        """
+        with self._refresh_lock:
+            clips = self._clips
+            updated: dict[str, tuple[int, int, ClipInfo] | None] = {}
+            for stem in dict.fromkeys(stems):
+                entry = clips.get(stem)
+                if entry is None:
+                    continue
+                path = entry[2].path
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    updated[stem] = None
+                    continue
+                if entry[:2] == (st.st_mtime_ns, st.st_size):
+                    continue
+                try:
+                    header = _read_header(path)
+                except (wave.Error, EOFError, OSError) as err:
+                    LOGGER.warning("Skipping unreadable clip %s: %s", path, err)
+                    updated[stem] = None
+                    continue
+                updated[stem] = (
+                    st.st_mtime_ns,
+                    st.st_size,
+                    ClipInfo(stem, path, *header),
+                )
+            if not updated:
+                return False
+            clips = dict(clips)
+            for stem, entry in updated.items():
+                if entry is None:
+                    clips.pop(stem, None)
+                else:
+                    clips[stem] = entry
+            self._clips = clips
+            self._save()
+            self.generation += 1
+            LOGGER.debug("Clip catalog revalidated: %s changed", ", ".join(updated))
+            return True
+
+    def _save(self) -> None:
+        """Atomically write the catalog index."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": CATALOG_VERSION,
+                    "sounds_path": str(self.sounds_path),
+                    "dir_mtime_ns": self._dir_mtime_ns,
+                    "clips": {
+                        stem: [
+                            mtime_ns,
+                            size,
+                            info.rate,
+                            info.width,
+                            info.channels,
+                            info.frames,
+                        ]
+                        for stem, (mtime_ns, size, info) in self._clips.items()
+                    },
+                },
+                separators=(",", ":"),
+            )
+        )
+        os.replace(tmp, self.index_path)
+
+    def get(self, stem: str) -> ClipInfo | None:
+        entry = self._clips.get(stem)
+        return entry[2] if entry is not None else None
+
+    def fingerprint(self, stem: str) -> tuple[int, int] | None:
+        """(mtime_ns, size) of a clip as of the last refresh."""
+        entry = self._clips.get(stem)
+        return entry[:2] if entry is not None else None
+
+    def phrase_duration(self, clip_names: list[str], silence_ms: int) -> float | None:
+        """Seconds a phrase of these clips lasts once rendered.
+
+        Sums each clip's normalized frame count and the gaps between clips,
+        without decoding audio. Returns None if a clip is not in the catalog.
+        """
+        frames = silence_frame_count(silence_ms) * max(len(clip_names) - 1, 0)
+        for name in clip_names:
+            info = self.get(name)
+            if info is None:
+                return None
+            frames += normalized_frame_count(info.channels, info.rate, info.frames)
+        return frames / TARGET_FRAMERATE
+
+    def names(self) -> list[str]:
+        """Sorted clip stems."""
+        return sorted(self._clips)
+
+    def __contains__(self, stem: str) -> bool:
+        return stem in self._clips
+
+    def __len__(self) -> int:
+        return len(self._clips)
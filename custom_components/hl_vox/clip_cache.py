@@ -0,0 +1,125 @@
+"""In-memory byte-budgeted LRU caches for clip PCM and finished phrases."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from collections.abc import Callable
+from typing import Any
+
+from .media import DEFAULT_RESAMPLE_QUALITY, _normalize_to_target
+
+
+class ByteLru:
+    """Thread-safe LRU bounded by the total size of its values.
+
+    Values are anything with a byte size given at put(); a value larger than
+    the whole budget is not cached. Hit/miss/eviction counters are kept for
+    sizing the budget.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        """Return the value for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        """Insert or replace key, evicting least recently used entries."""
+        with self._lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict()
+
+    def pop(self, key: str) -> None:
+        """Remove key if present."""
+        with self._lock:
+            self._pop(key)
+
+    def _pop(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old[1]
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the budget, evicting as needed."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class ClipPcmCache(ByteLru):
+    """Byte-budgeted LRU of normalized (16-bit mono 11025 Hz) clip PCM.
+
+    Entries are keyed by clip path and validated against the file's mtime and
+    size, so a replaced clip is decoded again on next use. Thread-safe: it is
+    called from executor jobs.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        quality: str = DEFAULT_RESAMPLE_QUALITY,
+        record: Callable[[str, float], None] | None = None,
+    ) -> None:
+        super().__init__(max_bytes)
+        self.quality = quality
+        self._record = record
+
+    def load(self, path: Path) -> bytes:
+        """Return normalized PCM for path, decoding it on a miss (blocking)."""
+        st = path.stat()
+        key = str(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0][0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0][1]
+            self.misses += 1
+        pcm = _normalize_to_target(path, quality=self.quality, record=self._record)
+        self.put(key, (signature, pcm), len(pcm))
+        return pcm
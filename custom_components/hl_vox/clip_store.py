@@ -0,0 +1,202 @@
+"""Persistent packed store of normalized clip PCM, read through mmap."""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from .media import (
+    TARGET_FRAMERATE,
+    TARGET_NCHANNELS,
+    TARGET_SAMPWIDTH,
+    DEFAULT_RESAMPLE_QUALITY,
+    _normalize_to_target,
+    normalized_pcm_size,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+PACK_FILE = "clips.pcm"
+INDEX_FILE = "clips.json"
+
+
+class ClipStore:
+    """All clips of a sounds directory normalized into one packed PCM file.
+
+    The index maps clip stem -> (offset, length, mtime_ns, size). Lookups
+    return zero-copy memoryview slices of an mmap of the pack; clips that are
+    not in the store go to fallback (usually ClipPcmCache.load). build() is
+    incremental: only clips whose mtime/size changed are normalized again,
+    or every clip when the resample quality differs from the stored one.
+    """
+
+    def __init__(
+        self,
+        store_dir: Path,
+        sounds_path: Path,
+        fallback: Callable[[Path], bytes] = _normalize_to_target,
+        quality: str = DEFAULT_RESAMPLE_QUALITY,
+    ) -> None:
+        self.store_dir = store_dir
+        self.sounds_path = sounds_path
+        self._fallback = fallback
+        self.quality = quality
+        # (clips index, mmap) swapped as one attribute so readers in executor
+        # threads never see a half-updated store
+        self._state: tuple[dict[str, list[int]], mmap.mmap | None] = ({}, None)
+        # Startup and catalog changes may both ask for a build
+        self._build_lock = threading.Lock()
+
+    @property
+    def _pack_path(self) -> Path:
+        return self.store_dir / PACK_FILE
+
+    @property
+    def _index_path(self) -> Path:
+        return self.store_dir / INDEX_FILE
+
+    def _read_index(self) -> dict[str, list[int]]:
+        """Return the on-disk clip index if it matches this store, else {}."""
+        try:
+            index = json.loads(self._index_path.read_text())
+            pack_size = self._pack_path.stat().st_size
+        except (OSError, ValueError):
+            return {}
+        if (
+            index.get("version") != STORE_VERSION
+            or index.get("format")
+            != [TARGET_FRAMERATE, TARGET_NCHANNELS, TARGET_SAMPWIDTH]
+            or index.get("resample_quality", DEFAULT_RESAMPLE_QUALITY) != self.quality
+            or index.get("sounds_path") != str(self.sounds_path)
+            or index.get("pack_size") != pack_size
+        ):
+            return {}
+        return index.get("clips") or {}
+
+    def _map_pack(self) -> mmap.mmap | None:
+        if not self._pack_path.is_file() or self._pack_path.stat().st_size == 0:
+            return None
+        with open(self._pack_path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load(self) -> bool:
+        """Map an existing store from disk (blocking). Return True if usable."""
+        clips = self._read_index()
+        if not clips:
+            return False
+        self._state = (clips, self._map_pack())
+        return True
+
+    def build(self) -> None:
+        """Bring the store up to date with the sounds directory (blocking).
+
+        Unchanged clips are copied from the current pack; new or modified ones
+        are normalized. The new pack and index are written to temp files and
+        renamed into place, so a crash never leaves a corrupt store.
+        """
+        with self._build_lock:
+            self._build()
+
+    def _build(self) -> None:
+        old_clips, old_mm = self._state
+        if not old_clips:
+            old_clips = self._read_index()
+            old_mm = self._map_pack() if old_clips else None
+        wavs = {}
+        for wav in self.sounds_path.glob("*.wav"):
+            st = wav.stat()
+            wavs[wav.stem] = (wav, st.st_mtime_ns, st.st_size)
+        unchanged = {
+            stem
+            for stem, (_, mtime_ns, size) in wavs.items()
+            if stem in old_clips and old_clips[stem][2:] == [mtime_ns, size]
+        }
+        if old_mm is not None and unchanged == set(wavs) == set(old_clips):
+            self._state = (old_clips, old_mm)
+            return
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_pack = self._pack_path.with_suffix(".pcm.tmp")
+        clips: dict[str, list[int]] = {}
+        offset = 0
+        normalized = 0
+        with open(tmp_pack, "wb") as out:
+            for stem in sorted(wavs):
+                wav, mtime_ns, size = wavs[stem]
+                if stem in unchanged and old_mm is not None:
+                    start, length = old_clips[stem][:2]
+                    pcm = old_mm[start : start + length]
+                else:
+                    try:
+                        pcm = _normalize_to_target(wav, quality=self.quality)
+                    except (ValueError, OSError, EOFError) as err:
+                        LOGGER.warning("Skipping clip %s in clip store: %s", wav, err)
+                        continue
+                    normalized += 1
+                out.write(pcm)
+                clips[stem] = [offset, len(pcm), mtime_ns, size]
+                offset += len(pcm)
+        tmp_index = self._index_path.with_suffix(".json.tmp")
+        tmp_index.write_text(
+            json.dumps(
+                {
+                    "version": STORE_VERSION,
+                    "format": [TARGET_FRAMERATE, TARGET_NCHANNELS, TARGET_SAMPWIDTH],
+                    "resample_quality": self.quality,
+                    "sounds_path": str(self.sounds_path),
+                    "pack_size": offset,
+                    "clips": clips,
+                },
+                separators=(",", ":"),
+            )
+        )
+        os.replace(tmp_pack, self._pack_path)
+        os.replace(tmp_index, self._index_path)
+        # The old mmap stays valid for readers holding slices of it; it is
+        # released once the last memoryview goes away.
+        self._state = (clips, self._map_pack())
+        LOGGER.debug(
+            "Clip store updated: %d clips, %d normalized, %d bytes",
+            len(clips),
+            normalized,
+            offset,
+        )
+
+    def _entry(self, path: Path) -> tuple[list[int] | None, mmap.mmap | None]:
+        """Index entry of a clip (and the pack it points into) if the store
+        holds its current content.
+
+        A clip replaced since the last build() goes to the fallback until
+        the next one, so a phrase never mixes in stale audio.
+        """
+        clips, mm = self._state
+        entry = clips.get(path.stem) if path.parent == self.sounds_path else None
+        if entry is not None:
+            st = path.stat()
+            if entry[2:] != [st.st_mtime_ns, st.st_size]:
+                entry = None
+        return entry, mm
+
+    def get(self, path: Path) -> bytes | memoryview:
+        """Return normalized PCM for a clip, from the store when possible."""
+        entry, mm = self._entry(path)
+        if entry is None or mm is None:
+            return self._fallback(path)
+        start, length = entry[:2]
+        return memoryview(mm)[start : start + length]
+
+    def pcm_size(self, path: Path) -> int:
+        """Return the normalized PCM length of a clip without decoding it."""
+        entry, _ = self._entry(path)
+        if entry is None:
+            return normalized_pcm_size(path)
+        return entry[1]
+
+    def __contains__(self, stem: str) -> bool:
+        return stem in self._state[0]
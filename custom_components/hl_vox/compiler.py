@@ -0,0 +1,98 @@
+"""Compile free text into a VOX clip list using the clip catalog."""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .catalog import ClipCatalog
+
+# Words (letters/digits/apostrophes) and the punctuation VOX has clips for
+_TOKEN_RE = re.compile(r"[a-z0-9']+|[,.]")
+# Punctuation token -> clip stem, used when the sounds directory has it
+PUNCTUATION_CLIPS = {",": "_comma", ".": "_period"}
+# Compiled texts remembered per catalog generation
+COMPILE_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledText:
+    """Clip stems for a text, and the words no clip matched."""
+
+    clips: tuple[str, ...]
+    unknown: tuple[str, ...]
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """Lowercase text and split it into words and ,/. tokens."""
+    return tuple(_TOKEN_RE.findall(text.lower()))
+
+
+def _stem_tokens(stem: str) -> tuple[str, ...]:
+    """Words a clip stem says, e.g. "all_personnel" -> ("all", "personnel")."""
+    return tuple(t for t in re.split(r"[^a-z0-9']+", stem.lower()) if t)
+
+
+class TextCompiler:
+    """Longest-match compiler from text to clip stems.
+
+    The index maps word tuples to clip stems (multi-word clips are stems
+    joined by underscores or dashes) and is rebuilt only when the catalog
+    changes. Results are memoized per normalized text, so templated
+    automations repeating the same sentence skip tokenizing and matching.
+    """
+
+    def __init__(self, catalog: ClipCatalog) -> None:
+        self._catalog = catalog
+        self._generation = -1
+        self._index: dict[tuple[str, ...], str] = {}
+        self._max_words = 1
+        self._compiled: OrderedDict[str, CompiledText] = OrderedDict()
+
+    def _ensure_index(self) -> None:
+        if self._generation == self._catalog.generation:
+            return
+        index: dict[tuple[str, ...], str] = {}
+        for stem in self._catalog.names():
+            words = _stem_tokens(stem)
+            if not words:
+                continue
+            # Prefer the plain stem (e.g. "comma" over "_comma") for a word
+            if words not in index or stem == "_".join(words):
+                index[words] = stem
+        for token, stem in PUNCTUATION_CLIPS.items():
+            if stem in self._catalog:
+                index[(token,)] = stem
+        self._index = index
+        self._max_words = max(map(len, index), default=1)
+        self._compiled.clear()
+        self._generation = self._catalog.generation
+
+    def compile(self, text: str) -> CompiledText:
+        """Return the clips for text, matching the longest known word run first."""
+        self._ensure_index()
+        key = " ".join(text.lower().split())
+        if (cached := self._compiled.get(key)) is not None:
+            self._compiled.move_to_end(key)
+            return cached
+        tokens = tokenize(key)
+        clips: list[str] = []
+        unknown: list[str] = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self._max_words, len(tokens) - i), 0, -1):
+                stem = self._index.get(tokens[i : i + n])
+                if stem is not None:
+                    clips.append(stem)
+                    i += n
+                    break
+            else:
+                if tokens[i] not in PUNCTUATION_CLIPS:
+                    unknown.append(tokens[i])
+                i += 1
+        result = CompiledText(tuple(clips), tuple(unknown))
+        self._compiled[key] = result
+        if len(self._compiled) > COMPILE_CACHE_SIZE:
+            self._compiled.popitem(last=False)
+        return result
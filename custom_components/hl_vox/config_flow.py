@@ -17,12 +17,55 @@ from homeassistant.helpers import config_validation as cv, selector
 
 from .const import (
     CONF_AUTO_FETCH_VOX,
+    CONF_AUTO_PHRASES_MAX,
+    CONF_BROWSE_AUTO_PHRASES,
+    CONF_CACHE_MAX_ENTRIES,
+    CONF_CACHE_MAX_MB,
+    CONF_CACHE_TTL_DAYS,
+    CONF_CLIP_STORE,
+    CONF_HOT_CACHE_MB,
+    CONF_OUTPUT_CODEC,
+    CONF_OUTPUT_PROFILES,
+    CONF_RESAMPLE_QUALITY,
+    CONF_PERSIST_AUTO_PHRASES,
     CONF_PHRASES,
+    CONF_PREWARM,
     CONF_SOUNDS_PATH,
+    CONF_VOX_SOURCE,
     DEFAULT_AUTO_FETCH_VOX,
+    DEFAULT_AUTO_PHRASES_MAX,
+    DEFAULT_BROWSE_AUTO_PHRASES,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CACHE_TTL_DAYS,
+    DEFAULT_CLIP_STORE,
+    DEFAULT_HOT_CACHE_MB,
+    DEFAULT_OUTPUT_CODEC,
+    DEFAULT_RESAMPLE_QUALITY,
+    DEFAULT_PERSIST_AUTO_PHRASES,
+    DEFAULT_PREWARM,
     DOMAIN,
+    HL1_VOX_REPO_ZIP,
 )
 from .download import ensure_vox_sounds
+from .media import CODECS, RESAMPLE_QUALITIES
+from .profiles import PROFILE_SCHEMA
+
+
+def _number_field(maximum: int, unit: str | None = None) -> vol.All:
+    """A whole-number box selector for the settings form."""
+    return vol.All(
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=maximum,
+                step=1,
+                unit_of_measurement=unit,
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Coerce(int),
+    )
 
 
 def _default_sounds_path(hass: HomeAssistant) -> str:
@@ -45,7 +88,10 @@ class HlVoxConfigFlow(ConfigFlow, domain=DOMAIN):
             )
             sounds_path = Path(sounds_path_str)
             auto_fetch = user_input.get(CONF_AUTO_FETCH_VOX, DEFAULT_AUTO_FETCH_VOX)
-            ok = await ensure_vox_sounds(self.hass, sounds_path, auto_fetch)
+            vox_source = user_input.get(CONF_VOX_SOURCE) or HL1_VOX_REPO_ZIP
+            ok = await ensure_vox_sounds(
+                self.hass, sounds_path, auto_fetch, vox_source
+            )
             if not ok and auto_fetch:
                 errors["base"] = "failed_fetch_vox"
             if not errors:
@@ -54,6 +100,10 @@ class HlVoxConfigFlow(ConfigFlow, domain=DOMAIN):
                     data={
                         CONF_SOUNDS_PATH: sounds_path_str,
                         CONF_AUTO_FETCH_VOX: auto_fetch,
+                        CONF_VOX_SOURCE: vox_source,
+                        CONF_CLIP_STORE: user_input.get(
+                            CONF_CLIP_STORE, DEFAULT_CLIP_STORE
+                        ),
                     },
                     options={CONF_PHRASES: {}},
                 )
@@ -70,6 +120,14 @@ class HlVoxConfigFlow(ConfigFlow, domain=DOMAIN):
                         CONF_AUTO_FETCH_VOX,
                         default=DEFAULT_AUTO_FETCH_VOX,
                     ): cv.boolean,
+                    vol.Optional(
+                        CONF_VOX_SOURCE,
+                        default=HL1_VOX_REPO_ZIP,
+                    ): cv.string,
+                    vol.Optional(
+                        CONF_CLIP_STORE,
+                        default=DEFAULT_CLIP_STORE,
+                    ): cv.boolean,
                 }
             ),
             errors=errors,
@@ -98,16 +156,102 @@ class HlVoxOptionsFlowHandler(OptionsFlow):
     async def async_step_init(
         self, user_input: dict | None = None
     ) -> ConfigFlowResult:
-        """Show menu: edit phrases (text), add phrase (picker), or done."""
+        """Show menu: edit phrases (text), add phrase (picker), settings, or done."""
         return self.async_show_menu(
             step_id="init",
             menu_options={
                 "edit_phrases_text": "Edit phrases (text)",
                 "add_phrase": "Add phrase",
+                "settings": "Settings",
+                "output_profiles": "Output profiles",
                 "done": "Done",
             },
         )
 
+    def _save_options(self, **changes) -> ConfigFlowResult:
+        """Save options, keeping the keys this step does not edit."""
+        return self.async_create_entry(
+            title="", data={**self.config_entry.options, **changes}
+        )
+
+    async def async_step_settings(
+        self, user_input: dict | None = None
+    ) -> ConfigFlowResult:
+        """Edit performance settings."""
+        if user_input is not None:
+            return self._save_options(**user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PREWARM,
+                        default=options.get(CONF_PREWARM, DEFAULT_PREWARM),
+                    ): cv.boolean,
+                    vol.Required(
+                        CONF_OUTPUT_CODEC,
+                        default=options.get(CONF_OUTPUT_CODEC, DEFAULT_OUTPUT_CODEC),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=list(CODECS),
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            translation_key=CONF_OUTPUT_CODEC,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_RESAMPLE_QUALITY,
+                        default=options.get(
+                            CONF_RESAMPLE_QUALITY, DEFAULT_RESAMPLE_QUALITY
+                        ),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=list(RESAMPLE_QUALITIES),
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            translation_key=CONF_RESAMPLE_QUALITY,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_HOT_CACHE_MB,
+                        default=options.get(CONF_HOT_CACHE_MB, DEFAULT_HOT_CACHE_MB),
+                    ): _number_field(256, "MB"),
+                    vol.Required(
+                        CONF_CACHE_MAX_MB,
+                        default=options.get(CONF_CACHE_MAX_MB, DEFAULT_CACHE_MAX_MB),
+                    ): _number_field(10240, "MB"),
+                    vol.Required(
+                        CONF_CACHE_MAX_ENTRIES,
+                        default=options.get(
+                            CONF_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_ENTRIES
+                        ),
+                    ): _number_field(100000),
+                    vol.Required(
+                        CONF_CACHE_TTL_DAYS,
+                        default=options.get(CONF_CACHE_TTL_DAYS, DEFAULT_CACHE_TTL_DAYS),
+                    ): _number_field(3650, "days"),
+                    vol.Required(
+                        CONF_AUTO_PHRASES_MAX,
+                        default=options.get(
+                            CONF_AUTO_PHRASES_MAX, DEFAULT_AUTO_PHRASES_MAX
+                        ),
+                    ): _number_field(10000),
+                    vol.Required(
+                        CONF_PERSIST_AUTO_PHRASES,
+                        default=options.get(
+                            CONF_PERSIST_AUTO_PHRASES, DEFAULT_PERSIST_AUTO_PHRASES
+                        ),
+                    ): cv.boolean,
+                    vol.Required(
+                        CONF_BROWSE_AUTO_PHRASES,
+                        default=options.get(
+                            CONF_BROWSE_AUTO_PHRASES, DEFAULT_BROWSE_AUTO_PHRASES
+                        ),
+                    ): cv.boolean,
+                }
+            ),
+        )
+
     async def async_step_done(
         self, user_input: dict | None = None
     ) -> ConfigFlowResult:
@@ -122,7 +266,7 @@ class HlVoxOptionsFlowHandler(OptionsFlow):
         """Edit phrases as text (one per line: phrase_id = clip1, clip2)."""
         if user_input is not None:
             phrases = _parse_phrases_text(user_input.get("phrases_text", ""))
-            return self.async_create_entry(title="", data={CONF_PHRASES: phrases})
+            return self._save_options(**{CONF_PHRASES: phrases})
 
         phrases = self.config_entry.options.get(CONF_PHRASES) or {}
         phrases_text = _format_phrases_text(phrases)
@@ -143,6 +287,38 @@ class HlVoxOptionsFlowHandler(OptionsFlow):
             },
         )
 
+    async def async_step_output_profiles(
+        self, user_input: dict | None = None
+    ) -> ConfigFlowResult:
+        """Edit per-player output profiles as text (one per line)."""
+        errors = {}
+        placeholders = {"error": ""}
+        text = _format_profiles_text(
+            self.config_entry.options.get(CONF_OUTPUT_PROFILES) or {}
+        )
+        if user_input is not None:
+            text = user_input.get("profiles_text", "")
+            try:
+                profiles = _parse_profiles_text(text)
+            except vol.Invalid as err:
+                errors["base"] = "invalid_output_profile"
+                placeholders["error"] = f"\n\n{err}"
+            else:
+                return self._save_options(**{CONF_OUTPUT_PROFILES: profiles})
+
+        return self.async_show_form(
+            step_id="output_profiles",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional("profiles_text", default=text): selector.TextSelector(
+                        selector.TextSelectorConfig(multiline=True)
+                    ),
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
     async def async_step_add_phrase(
         self, user_input: dict | None = None
     ) -> ConfigFlowResult:
@@ -154,7 +330,10 @@ class HlVoxOptionsFlowHandler(OptionsFlow):
         def _list_wav_stems() -> list[str]:
             return sorted({f.stem for f in sounds_path.glob("*.wav")})
 
-        clip_names = await self.hass.async_add_executor_job(_list_wav_stems)
+        if data := self.hass.data.get(DOMAIN):
+            clip_names = data["catalog"].names()
+        else:
+            clip_names = await self.hass.async_add_executor_job(_list_wav_stems)
         if not clip_names:
             return self.async_abort(reason="no_wav_clips")
 
@@ -206,7 +385,7 @@ class HlVoxOptionsFlowHandler(OptionsFlow):
                 )
             phrases = dict(self.config_entry.options.get(CONF_PHRASES) or {})
             phrases[phrase_id] = clips
-            return self.async_create_entry(title="", data={CONF_PHRASES: phrases})
+            return self._save_options(**{CONF_PHRASES: phrases})
 
         return self.async_show_form(
             step_id="add_phrase",
@@ -231,6 +410,44 @@ def _parse_phrases_text(text: str) -> dict[str, list[str]]:
     return result
 
 
+def _parse_profiles_text(text: str) -> dict[str, dict]:
+    """Parse 'target = key=value, ...' lines into {target: profile}.
+
+    target is a media player entity ID or an integration name; keys are
+    codec, rate and channels. Raises vol.Invalid naming the bad line.
+    """
+    result = {}
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        target, _, rest = line.partition("=")
+        target = target.strip()
+        fields = {}
+        for part in rest.split(","):
+            key, sep, value = part.partition("=")
+            if part.strip() and not sep:
+                raise vol.Invalid(f"{line}: expected key=value, got {part.strip()}")
+            if sep:
+                fields[key.strip()] = value.strip()
+        if not target:
+            raise vol.Invalid(f"{line}: missing entity ID or integration")
+        try:
+            result[target] = PROFILE_SCHEMA(fields)
+        except vol.Invalid as err:
+            raise vol.Invalid(f"{line}: {err}") from err
+    return result
+
+
+def _format_profiles_text(profiles: dict[str, dict]) -> str:
+    """Format profiles as text for the text area."""
+    return "\n".join(
+        f"{target} = "
+        + ", ".join(f"{key}={value}" for key, value in sorted(profile.items()))
+        for target, profile in sorted(profiles.items())
+    )
+
+
 def _format_phrases_text(phrases: dict[str, list[str]]) -> str:
     """Format phrases dict as text for the text area."""
     if not phrases:
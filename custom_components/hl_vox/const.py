@@ -1,17 +1,82 @@
 """Constants for the Half-Life VOX integration."""
 
+from datetime import timedelta
+
 DOMAIN = "hl_vox"
 
 CONF_SOUNDS_PATH = "sounds_path"
 CONF_AUTO_FETCH_VOX = "auto_fetch_vox"
 CONF_PHRASES = "phrases"
+CONF_CLIP_STORE = "clip_store"
+CONF_HOT_CACHE_MB = "hot_cache_mb"
+CONF_CACHE_MAX_MB = "cache_max_mb"
+CONF_CACHE_MAX_ENTRIES = "cache_max_entries"
+CONF_CACHE_TTL_DAYS = "cache_ttl_days"
+CONF_AUTO_PHRASES_MAX = "auto_phrases_max"
+CONF_PERSIST_AUTO_PHRASES = "persist_auto_phrases"
+CONF_BROWSE_AUTO_PHRASES = "browse_auto_phrases"
+CONF_PREWARM = "prewarm"
+CONF_VOX_SOURCE = "vox_source"
+CONF_OUTPUT_CODEC = "output_codec"
+CONF_RESAMPLE_QUALITY = "resample_quality"
+CONF_OUTPUT_PROFILES = "output_profiles"
 
 DEFAULT_AUTO_FETCH_VOX = True
+DEFAULT_CLIP_STORE = True
 DEFAULT_SILENCE_MS = 150
+# Codec phrases are served in unless a request asks for another (media.CODECS)
+DEFAULT_OUTPUT_CODEC = "pcm16"
+# Resampler for clips not at 11025 Hz (media.RESAMPLE_QUALITIES); changing it
+# renormalizes the clip store on the next start
+DEFAULT_RESAMPLE_QUALITY = "linear"
+
+# Phrases created by play_clips are kept in a bounded registry, separate
+# from the user-defined phrases, and hidden from the media browser by default
+DEFAULT_AUTO_PHRASES_MAX = 200
+DEFAULT_PERSIST_AUTO_PHRASES = True
+DEFAULT_BROWSE_AUTO_PHRASES = False
+
+# Pre-render all user-defined phrases after startup and after edits, with at
+# most this many builds running at once
+DEFAULT_PREWARM = True
+PREWARM_CONCURRENCY = 2
+
+# Memory budget for normalized clip PCM shared across phrase builds
+# (the full VOX library is roughly 8 MB at 16-bit mono 11025 Hz)
+DEFAULT_CLIP_CACHE_MB = 16
+
+# Memory budget for finished phrase WAVs served without touching the disk
+# (0 disables); a typical phrase is 50-150 kB
+DEFAULT_HOT_CACHE_MB = 8
 
 # Cache for built phrase WAVs (filesystem)
 CACHE_DIR_NAME = "cache"
 
+# Phrase cache limits (0 = unlimited) and how often they are enforced
+DEFAULT_CACHE_MAX_MB = 100
+DEFAULT_CACHE_MAX_ENTRIES = 500
+DEFAULT_CACHE_TTL_DAYS = 30
+CACHE_PRUNE_INTERVAL = timedelta(hours=1)
+
+# Dispatcher signal sent when the phrase cache changes size
+SIGNAL_CACHE_UPDATED = f"{DOMAIN}_cache_updated"
+# Dispatcher signal sent when an announcement queue changes
+SIGNAL_QUEUE_UPDATED = f"{DOMAIN}_queue_updated"
+
+# Announcement queues: the same phrase queued again within this many seconds
+# is dropped, and queued phrases play this many seconds apart
+QUEUE_COALESCE_SECONDS = 10
+QUEUE_GAP_SECONDS = 0.5
+
+# Packed, pre-normalized copy of the sounds directory (next to the cache)
+CLIP_STORE_DIR_NAME = "clip_store"
+
+# Persisted clip catalog (stem -> WAV header fields), next to the cache
+CLIP_CATALOG_FILE = "clip_catalog.json"
+
 # GitHub repo ZIP for Half-Life sound files (sound/vox only)
 HL1_VOX_REPO_ZIP = "https://github.com/sourcesounds/hl1/archive/refs/heads/master.zip"
 HL1_VOX_ZIP_PREFIX = "hl1-master/sound/vox/"
+
+# Clip name -> [size, sha256] for the extracted sounds (in the sounds dir)
+VOX_MANIFEST_NAME = ".vox_manifest.json"
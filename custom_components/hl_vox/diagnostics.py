@@ -0,0 +1,54 @@
+"""Diagnostics for HL VOX: pipeline timings and cache state."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PHRASES, CONF_SOUNDS_PATH, CONF_VOX_SOURCE, DOMAIN
+
+TO_REDACT = {CONF_VOX_SOURCE, CONF_SOUNDS_PATH}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return timings per pipeline stage (ms), cache stats and settings.
+
+    Phrases are reduced to their number and the clip source and sounds
+    path are redacted. The stage timings show whether slow announcements
+    come from rendering, disk reads or the network.
+    """
+    data = hass.data.get(DOMAIN) or {}
+    options = {k: v for k, v in entry.options.items() if k != CONF_PHRASES}
+    diagnostics: dict[str, Any] = {
+        "data": async_redact_data(entry.data, TO_REDACT),
+        "options": options,
+        "phrases": len(entry.options.get(CONF_PHRASES) or {}),
+    }
+    if not data:
+        return diagnostics
+    if metrics := data.get("metrics"):
+        diagnostics["timings_ms"] = metrics.as_dict()
+    if builder := data.get("builder"):
+        diagnostics["builds"] = builder.builds
+    for name in ("hot_phrases", "clip_cache"):
+        if cache := data.get(name):
+            diagnostics[name] = cache.stats()
+    if manager := data.get("cache_manager"):
+        diagnostics["phrase_cache"] = {
+            "entries": manager.entries,
+            "total_bytes": manager.total_bytes,
+            "max_bytes": manager.max_bytes,
+            "max_entries": manager.max_entries,
+            "ttl_seconds": manager.ttl_seconds,
+        }
+    if announcer := data.get("announcer"):
+        diagnostics["queues"] = announcer.as_dict()
+    diagnostics["clip_store"] = data.get("clip_store") is not None
+    if (auto_phrases := data.get("auto_phrases")) is not None:
+        diagnostics["auto_phrases"] = len(auto_phrases)
+    return diagnostics
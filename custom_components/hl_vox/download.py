@@ -1,28 +1,199 @@
-"""Download and extract Half-Life VOX sounds from sourcesounds/hl1."""
+"""Download and extract Half-Life VOX sounds from sourcesounds/hl1.
 
+The source can be the GitHub archive (default), any HTTP(S) mirror of it, or
+a local ZIP file for installs without internet access. After extraction a
+manifest of clip name -> size/SHA-256 is written to the sounds directory;
+later setups only check that it exists, and a background check uses it to
+re-extract just the clips that are missing or damaged. Clips a repair could
+not restore are recorded in the manifest and not retried for a while.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
 import zipfile
-import io
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import aiohttp
+
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import HL1_VOX_REPO_ZIP, HL1_VOX_ZIP_PREFIX
+from .const import HL1_VOX_REPO_ZIP, HL1_VOX_ZIP_PREFIX, VOX_MANIFEST_NAME
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+LOGGER = logging.getLogger(__name__)
+
+# The archive is streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Log download progress every this many bytes
+DOWNLOAD_LOG_INTERVAL = 20 * 1024 * 1024
+# Buffer size for copying ZIP members to disk
+EXTRACT_COPY_BUFFER = 64 * 1024
+# Members extracted concurrently (decompression and file I/O release the GIL)
+EXTRACT_WORKERS = 4
+# Present in the sounds directory while an extraction is in progress, so an
+# interrupted one is redone rather than mistaken for a hand-populated folder
+EXTRACT_MARKER_NAME = ".vox_extracting"
+# Clips a repair could not restore (offline, or deleted on purpose) are not
+# retried for this long, so startups do not download the archive every time
+REPAIR_RETRY_SECONDS = 7 * 24 * 3600
+# Timeout of the check that a remote source is reachable before a repair
+REACHABLE_TIMEOUT = 10
+
+
+def _peak_rss_mb() -> float | None:
+    """Return the process's peak resident set size in MB, if known."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _format_mb(value: float | None) -> str:
+    return "unknown" if value is None else f"{value:.0f}"
+
+
+def _vox_members(zf: zipfile.ZipFile) -> dict[str, zipfile.ZipInfo]:
+    """Map output file name -> ZIP member for the VOX clips in an archive.
+
+    Accepts the hl1 repo layout (any top-level folder name, so renamed
+    mirrors work) and falls back to every .wav in archives that hold only
+    the VOX folder.
+    """
+    members: dict[str, zipfile.ZipInfo] = {}
+    marker = HL1_VOX_ZIP_PREFIX.split("/", 1)[1]  # "sound/vox/"
+    for info in zf.infolist():
+        name = info.filename
+        if info.is_dir() or not (name.startswith(marker) or f"/{marker}" in name):
+            continue
+        inner = name.split(marker, 1)[1].lstrip("/")
+        if inner:
+            # Flatten: e.g. buzzwarn.wav -> sounds_path/buzzwarn.wav
+            members[Path(inner).name] = info
+    if not members:
+        for info in zf.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(".wav"):
+                members[Path(info.filename).name] = info
+    return members
+
+
+def _copy_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, out_path: Path) -> list:
+    """Stream one member to out_path; return its [size, sha256].
+
+    Writes to a hidden temp file renamed into place, so out_path is either
+    absent or complete, never truncated.
+    """
+    part_path = out_path.with_name(f".{out_path.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with zf.open(info) as src, open(part_path, "wb") as dst:
+            while chunk := src.read(EXTRACT_COPY_BUFFER):
+                digest.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        os.replace(part_path, out_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    return [size, digest.hexdigest()]
+
 
+def _extract_vox_from_zip(
+    zip_path: Path, sounds_path: Path, only: set[str] | None = None
+) -> dict[str, list]:
+    """Extract only sound/vox contents from the hl1 repo ZIP into sounds_path (blocking).
 
-def _extract_vox_from_zip(zip_bytes: bytes, sounds_path: Path) -> None:
-    """Extract only sound/vox contents from the hl1 repo ZIP into sounds_path (blocking)."""
+    Members are copied to disk in small buffers rather than read whole, by
+    a small thread pool sharing one ZipFile. If only is given, just those
+    clip file names are extracted. Returns the manifest entries
+    (name -> [size, sha256]) of the extracted files.
+    """
     sounds_path.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as zf:
-        for name in zf.namelist():
-            if not name.startswith(HL1_VOX_ZIP_PREFIX):
-                continue
-            inner = name[len(HL1_VOX_ZIP_PREFIX) :].lstrip("/")
-            if not inner or name.endswith("/"):
+    for stale in sounds_path.glob(".*.part"):
+        stale.unlink(missing_ok=True)
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        members = {
+            out_name: info
+            for out_name, info in _vox_members(zf).items()
+            if only is None or out_name in only
+        }
+        with ThreadPoolExecutor(EXTRACT_WORKERS, "hl_vox_extract") as pool:
+            futures = {
+                out_name: pool.submit(_copy_member, zf, info, sounds_path / out_name)
+                for out_name, info in members.items()
+            }
+            return {out_name: fut.result() for out_name, fut in futures.items()}
+
+
+def _read_manifest(sounds_path: Path) -> dict | None:
+    """Return the manifest of sounds_path, or None if absent/invalid.
+
+    "clips" maps clip name -> [size, sha256]; "skipped" maps the clips a
+    repair failed to restore -> when it last tried (Unix time).
+    """
+    try:
+        manifest = json.loads((sounds_path / VOX_MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or "clips" not in manifest:
+        return None
+    manifest.setdefault("skipped", {})
+    return manifest
+
+
+def _write_manifest(
+    sounds_path: Path,
+    source: str,
+    clips: dict[str, list],
+    skipped: dict[str, float] | None = None,
+) -> None:
+    """Atomically write the clip manifest."""
+    tmp = sounds_path / f"{VOX_MANIFEST_NAME}.tmp"
+    tmp.write_text(
+        json.dumps(
+            {"source": source, "clips": clips, "skipped": skipped or {}},
+            sort_keys=True,
+        )
+    )
+    os.replace(tmp, sounds_path / VOX_MANIFEST_NAME)
+
+
+def _find_damaged_clips(
+    sounds_path: Path,
+    manifest: dict[str, list],
+    deep: bool = False,
+    skip: Collection[str] = (),
+) -> set[str]:
+    """Return manifest clips that are missing or damaged (blocking).
+
+    Compares sizes (one stat per clip); deep also compares SHA-256 hashes.
+    Clips in skip are not checked.
+    """
+    damaged = set()
+    for name, (size, sha256) in manifest.items():
+        if name in skip:
+            continue
+        path = sounds_path / name
+        try:
+            if path.stat().st_size != size:
+                damaged.add(name)
                 continue
-            # Flatten: e.g. buzzwarn.wav -> sounds_path/buzzwarn.wav
-            out_name = Path(inner).name
-            out_path = sounds_path / out_name
-            out_path.write_bytes(zf.read(name))
+        except FileNotFoundError:
+            damaged.add(name)
+            continue
+        if deep and hashlib.sha256(path.read_bytes()).hexdigest() != sha256:
+            damaged.add(name)
+    return damaged
 
 
 def _sounds_dir_has_wavs(sounds_path: Path) -> bool:
@@ -32,23 +203,215 @@ def _sounds_dir_has_wavs(sounds_path: Path) -> bool:
     return any(sounds_path.glob("*.wav"))
 
 
-async def ensure_vox_sounds(hass, sounds_path: Path, auto_fetch: bool) -> bool:
+def _sounds_dir_state(sounds_path: Path) -> str:
+    """Return "complete", "incomplete" or "empty" for the sounds directory.
+
+    The manifest is written last, so its presence marks a finished
+    extraction. Without it, an extraction marker means one was interrupted;
+    WAVs with neither were put there by hand and are used as-is.
+    """
+    if (sounds_path / VOX_MANIFEST_NAME).is_file():
+        return "complete"
+    if (sounds_path / EXTRACT_MARKER_NAME).exists():
+        return "incomplete"
+    return "complete" if _sounds_dir_has_wavs(sounds_path) else "empty"
+
+
+def _begin_extract(sounds_path: Path) -> None:
+    sounds_path.mkdir(parents=True, exist_ok=True)
+    (sounds_path / EXTRACT_MARKER_NAME).touch()
+
+
+def _finish_extract(sounds_path: Path, source: str, clips: dict[str, list]) -> None:
+    _write_manifest(sounds_path, source, clips)
+    (sounds_path / EXTRACT_MARKER_NAME).unlink(missing_ok=True)
+
+
+def _open_temp_zip(directory: Path):
+    """Create a temp file for the archive next to the sounds directory."""
+    fd, name = tempfile.mkstemp(dir=directory, prefix=".hl1-", suffix=".zip")
+    return os.fdopen(fd, "wb"), Path(name)
+
+
+async def _async_download_to_file(hass, url: str, directory: Path) -> Path:
+    """Stream url into a temp file in directory and return its path."""
+    session = async_get_clientsession(hass)
+    out, zip_path = await hass.async_add_executor_job(_open_temp_zip, directory)
+    start = time.monotonic()
+    received = 0
+    next_log = DOWNLOAD_LOG_INTERVAL
+    try:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            total = resp.content_length
+            async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                await hass.async_add_executor_job(out.write, chunk)
+                received += len(chunk)
+                if received >= next_log:
+                    next_log += DOWNLOAD_LOG_INTERVAL
+                    LOGGER.debug(
+                        "Downloaded %.1f MB%s",
+                        received / 1e6,
+                        f" of {total / 1e6:.1f} MB" if total else "",
+                    )
+    except BaseException:
+        await hass.async_add_executor_job(out.close)
+        await hass.async_add_executor_job(zip_path.unlink, True)
+        raise
+    await hass.async_add_executor_job(out.close)
+    LOGGER.info(
+        "Downloaded VOX archive (%.1f MB) in %.1f s; peak RSS %s MB",
+        received / 1e6,
+        time.monotonic() - start,
+        _format_mb(_peak_rss_mb()),
+    )
+    return zip_path
+
+
+async def _async_source_reachable(hass, url: str) -> bool:
+    """Return True if a HEAD request for url succeeds within a few seconds."""
+    session = async_get_clientsession(hass)
+    try:
+        async with session.head(
+            url,
+            allow_redirects=True,
+            timeout=aiohttp.ClientTimeout(total=REACHABLE_TIMEOUT),
+        ) as resp:
+            return resp.status < 400
+    except (aiohttp.ClientError, TimeoutError):
+        return False
+
+
+def _local_source_path(source: str) -> Path | None:
+    """Return the ZIP path if source is a local file rather than a URL."""
+    if source.startswith(("http://", "https://")):
+        return None
+    return Path(source.removeprefix("file://"))
+
+
+async def _async_fetch_and_extract(
+    hass, source: str, sounds_path: Path, only: set[str] | None = None
+) -> dict[str, list]:
+    """Get the archive from source and extract (some of) its VOX clips."""
+    if (local_zip := _local_source_path(source)) is not None:
+        return await hass.async_add_executor_job(
+            _extract_vox_from_zip, local_zip, sounds_path, only
+        )
+    zip_path = await _async_download_to_file(hass, source, sounds_path.parent)
+    try:
+        return await hass.async_add_executor_job(
+            _extract_vox_from_zip, zip_path, sounds_path, only
+        )
+    finally:
+        await hass.async_add_executor_job(zip_path.unlink, True)
+
+
+async def ensure_vox_sounds(
+    hass, sounds_path: Path, auto_fetch: bool, source: str = HL1_VOX_REPO_ZIP
+) -> bool:
     """
     Ensure the VOX sounds directory is populated. If auto_fetch is True and the
-    directory is empty or missing, download and extract from sourcesounds/hl1.
+    directory is empty or missing, download and extract from source (the
+    sourcesounds/hl1 archive, a mirror URL or a local ZIP path).
     Returns True if sounds are available (pre-existing or after fetch), False otherwise.
     """
-    if _sounds_dir_has_wavs(sounds_path):
+    state = await hass.async_add_executor_job(_sounds_dir_state, sounds_path)
+    if state == "complete":
         return True
     if not auto_fetch:
+        if state == "incomplete":
+            LOGGER.warning("VOX extraction in %s did not finish", sounds_path)
         return False
-    sounds_path.mkdir(parents=True, exist_ok=True)
-    session = async_get_clientsession(hass)
+    await hass.async_add_executor_job(_begin_extract, sounds_path)
     try:
-        async with session.get(HL1_VOX_REPO_ZIP) as resp:
-            resp.raise_for_status()
-            zip_bytes = await resp.read()
-    except Exception:
+        clips = await _async_fetch_and_extract(hass, source, sounds_path)
+    except Exception as err:  # network, HTTP, disk and ZIP errors alike
+        LOGGER.warning("Failed to fetch VOX sounds from %s: %s", source, err)
         return False
-    await hass.async_add_executor_job(_extract_vox_from_zip, zip_bytes, sounds_path)
-    return _sounds_dir_has_wavs(sounds_path)
+    if not clips:
+        LOGGER.warning("No VOX clips found in %s", source)
+        return False
+    await hass.async_add_executor_job(_finish_extract, sounds_path, source, clips)
+    LOGGER.info(
+        "Extracted %d VOX clips to %s; peak RSS %s MB",
+        len(clips),
+        sounds_path,
+        _format_mb(_peak_rss_mb()),
+    )
+    return True
+
+
+async def async_repair_vox_sounds(
+    hass, sounds_path: Path, source: str = HL1_VOX_REPO_ZIP, deep: bool = False
+) -> set[str]:
+    """Re-extract clips that the manifest lists but are missing or damaged.
+
+    Only those members are written; a remote source still has to be
+    downloaded whole, since the archive cannot be read partially, and is
+    skipped if it is unreachable. Clips that could not be restored (source
+    unreachable or failing, or not in the archive) are recorded in the
+    manifest and not retried for REPAIR_RETRY_SECONDS, so a clip deleted on
+    purpose or an offline install does not cost a download attempt and a
+    warning on every start. Returns the names of the repaired clips.
+    """
+    manifest = await hass.async_add_executor_job(_read_manifest, sounds_path)
+    if not manifest or not manifest["clips"]:
+        return set()
+    now = time.time()
+    skipped: dict[str, float] = manifest["skipped"]
+    damaged = await hass.async_add_executor_job(
+        _find_damaged_clips,
+        sounds_path,
+        manifest["clips"],
+        deep,
+        {
+            name
+            for name, tried in skipped.items()
+            if now - tried < REPAIR_RETRY_SECONDS
+        },
+    )
+    if not damaged:
+        return set()
+
+    async def _async_give_up() -> set[str]:
+        skipped.update(dict.fromkeys(damaged, now))
+        await hass.async_add_executor_job(
+            _write_manifest,
+            sounds_path,
+            manifest.get("source", source),
+            manifest["clips"],
+            skipped,
+        )
+        return set()
+
+    if _local_source_path(source) is None and not await _async_source_reachable(
+        hass, source
+    ):
+        LOGGER.info(
+            "%d VOX clips are missing or damaged but %s is unreachable; "
+            "not retrying for %d days",
+            len(damaged),
+            source,
+            REPAIR_RETRY_SECONDS // 86400,
+        )
+        return await _async_give_up()
+    LOGGER.warning("Re-extracting %d missing or damaged VOX clips", len(damaged))
+    try:
+        clips = await _async_fetch_and_extract(hass, source, sounds_path, damaged)
+    except Exception as err:  # network, HTTP, disk and ZIP errors alike
+        LOGGER.warning("Failed to repair VOX sounds from %s: %s", source, err)
+        return await _async_give_up()
+    manifest["source"] = source
+    manifest["clips"].update(clips)
+    for name in clips:
+        skipped.pop(name, None)
+    damaged -= set(clips)
+    if damaged:
+        LOGGER.warning(
+            "%d VOX clips are not in %s: %s", len(damaged), source, sorted(damaged)
+        )
+        return set(clips) | await _async_give_up()
+    await hass.async_add_executor_job(
+        _write_manifest, sounds_path, source, manifest["clips"], skipped
+    )
+    return set(clips)
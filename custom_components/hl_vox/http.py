@@ -1,23 +1,163 @@
-"""HTTP view to serve concatenated VOX phrase WAV to Cast and other players."""
+"""HTTP view to serve concatenated VOX phrase audio to Cast and other players."""
 
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
 
 from aiohttp import web
+from aiohttp.abc import AbstractStreamWriter
 
 from homeassistant.components import http
 from homeassistant.core import HomeAssistant
 
 from .const import DEFAULT_SILENCE_MS, DOMAIN
-from .media import concat_wavs
+from .media import CODEC_PCM16, DEFAULT_RESAMPLE_QUALITY
+from .metrics import (
+    STAGE_CACHE_LOOKUP,
+    STAGE_DISK_READ,
+    STAGE_REQUEST,
+    STAGE_RESPONSE,
+    Metrics,
+)
+from .phrases import get_phrase_clips
+from .profiles import profile_from_query
+from .render import (
+    BUILD_ERRORS,
+    CachedPhrase,
+    MissingClipError,
+    async_clip_paths,
+    cache_filename,
+    read_cached_phrase,
+    render_key,
+)
 
 LOGGER = logging.getLogger(__name__)
 
 
+class _ResponseSink:
+    """Stream a phrase build into an HTTP response; stop quietly on disconnect."""
+
+    def __init__(self, request: web.Request) -> None:
+        self.request = request
+        self.response = web.StreamResponse()
+        self.connected = True
+
+    async def start(self, content_length: int | None, content_type: str) -> None:
+        # Without a length (FLAC) the response is sent chunked
+        self.response.content_length = content_length
+        self.response.content_type = content_type
+        await self.response.prepare(self.request)
+
+    async def write(self, chunk: bytes | memoryview) -> None:
+        if not self.connected:
+            return
+        try:
+            await self.response.write(chunk)
+        except ConnectionResetError:
+            self.connected = False
+
+
+def _serve_in_memory(request: web.Request, phrase: CachedPhrase) -> web.Response:
+    """Serve a phrase from the hot cache, with the same validators as disk.
+
+    Mirrors FileResponse: If-None-Match / If-Modified-Since give 304, a
+    single Range (honoring If-Range) gives 206 or 416.
+    """
+    response = web.Response(
+        headers={
+            "Content-Type": phrase.content_type,
+            "Cache-Control": "no-cache",
+            "Accept-Ranges": "bytes",
+        }
+    )
+    response.etag = phrase.etag
+    response.last_modified = phrase.last_modified
+    if_none_match = request.if_none_match
+    if (
+        if_none_match is not None
+        and any(tag.value in (phrase.etag, "*") for tag in if_none_match)
+    ) or (
+        if_none_match is None
+        and (since := request.if_modified_since) is not None
+        and phrase.last_modified <= since.timestamp()
+    ):
+        response.set_status(304)
+        return response
+    body = phrase.body
+    size = len(body)
+    if (if_range := request.if_range) is None or (
+        phrase.last_modified <= if_range.timestamp()
+    ):
+        try:
+            rng = request.http_range
+        except ValueError:
+            rng = None
+            start = size
+        else:
+            start, stop, _ = rng.indices(size)
+        if rng is None or (
+            (rng.start is not None or rng.stop is not None) and start >= size
+        ):
+            response.set_status(416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+        if rng.start is not None or rng.stop is not None:
+            response.set_status(206)
+            response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+            body = body[start:stop]
+    response.body = body
+    return response
+
+
+class _TimedFileResponse(web.FileResponse):
+    """Serve a finished phrase from disk, timing the send.
+
+    FileResponse uses sendfile and handles the validators itself: a strong
+    ETag and Last-Modified from the file's mtime/size, If-None-Match /
+    If-Modified-Since (304) and Range / If-Range (206). Cache files are
+    only ever replaced as a whole, so the validators change exactly when
+    the rendered audio does. "no-cache" makes players revalidate instead
+    of re-downloading.
+
+    The file is sent by prepare(), after the view has returned, so this
+    records the response and request times itself.
+    """
+
+    def __init__(
+        self, cache_path: Path, content_type: str, metrics: Metrics, start: float
+    ) -> None:
+        super().__init__(
+            cache_path,
+            headers={"Content-Type": content_type, "Cache-Control": "no-cache"},
+        )
+        self._timing = metrics
+        self._request_start = start
+
+    async def prepare(self, request: web.BaseRequest) -> AbstractStreamWriter | None:
+        try:
+            with self._timing.timer(STAGE_RESPONSE):
+                return await super().prepare(request)
+        finally:
+            self._timing.record(
+                STAGE_REQUEST, time.perf_counter() - self._request_start
+            )
+
+
 class HlVoxAudioView(http.HomeAssistantView):
-    """Serve a phrase as a single WAV file; no auth so Cast can fetch the URL."""
+    """Serve a phrase as a single WAV file; no auth so Cast can fetch the URL.
+
+    ?codec= picks the output codec (pcm16, pcm8, mulaw, ima_adpcm, flac);
+    without it the configured default is used. ?rate= and ?channels= pick
+    the output profile's sample rate and channel count (default 11025 Hz
+    mono). Renders are cached by content (see render_key), so phrases with
+    the same clips share one cache file.
+
+    Each stage is timed into the metrics (see metrics.STAGES): the cache
+    lookup, reading a cache file into memory, sending a finished phrase and
+    the whole request; a build times itself.
+    """
 
     name = "api:hl_vox:audio"
     url = "/api/hl_vox/audio/{phrase_id}"
@@ -30,52 +170,105 @@ class HlVoxAudioView(http.HomeAssistantView):
         self,
         request: web.Request,
         phrase_id: str,
-    ) -> web.Response:
-        """Serve phrase WAV from cache or build and cache it."""
+    ) -> web.StreamResponse:
+        """Serve phrase WAV from cache or build, stream and cache it."""
         data = self.hass.data.get(DOMAIN)
         if not data:
             return web.Response(status=503, text="Integration not configured")
-        phrases = data.get("phrases") or {}
+        metrics: Metrics = data.get("metrics") or Metrics()
+        start = time.perf_counter()
+        response = await self._async_get(request, phrase_id, data, metrics, start)
+        if response.status >= 400 or isinstance(response, _TimedFileResponse):
+            return response
+        if not response.prepared:
+            # Send it here rather than after returning, so the time spent
+            # on the network is measured too
+            with metrics.timer(STAGE_RESPONSE):
+                await response.prepare(request)
+                await response.write_eof()
+        metrics.record(STAGE_REQUEST, time.perf_counter() - start)
+        return response
+
+    async def _async_get(
+        self,
+        request: web.Request,
+        phrase_id: str,
+        data: dict,
+        metrics: Metrics,
+        start: float,
+    ) -> web.StreamResponse:
+        clip_names = get_phrase_clips(data, phrase_id)
         sounds_path: Path = data.get("sounds_path")
         cache_dir: Path | None = data.get("cache_dir")
         silence_ms = data.get("silence_ms", DEFAULT_SILENCE_MS)
-        if not sounds_path or phrase_id not in phrases:
+        if not sounds_path or clip_names is None:
             return web.Response(status=404, text="Unknown phrase")
         if not cache_dir:
             return web.Response(status=503, text="Cache not configured")
-        cache_path = cache_dir / f"{phrase_id}.wav"
-        if cache_path.is_file():
-            wav_bytes = await self.hass.async_add_executor_job(
-                cache_path.read_bytes,
+        try:
+            profile = profile_from_query(
+                request.query, data.get("output_codec", CODEC_PCM16)
             )
-            return web.Response(body=wav_bytes, content_type="audio/wav")
-        clip_names = phrases[phrase_id]
-        paths = []
-        for name in clip_names:
-            p = sounds_path / f"{name}.wav"
-            if not p.is_file():
-                return web.Response(status=404, text=f"Missing clip: {name}")
-            paths.append(p)
+        except ValueError as err:
+            return web.Response(status=400, text=str(err))
+        catalog = data["catalog"]
+        lookup_start = time.perf_counter()
         try:
-            await self.hass.async_add_executor_job(
-                concat_wavs,
-                paths,
-                cache_path,
-                silence_ms,
+            paths = await async_clip_paths(self.hass, catalog, clip_names)
+        except MissingClipError as err:
+            return web.Response(status=404, text=str(err))
+        key = render_key(
+            catalog,
+            clip_names,
+            silence_ms,
+            profile,
+            data.get("resample_quality", DEFAULT_RESAMPLE_QUALITY),
+        )
+        content_type = profile.output.content_type
+        hot_phrases = data.get("hot_phrases")
+        cache_manager = data.get("cache_manager")
+        if hot_phrases and (phrase := hot_phrases.get(key)) is not None:
+            metrics.record(STAGE_CACHE_LOOKUP, time.perf_counter() - lookup_start)
+            if cache_manager:
+                cache_manager.touch(key)
+            return _serve_in_memory(request, phrase)
+        cache_path = cache_dir / cache_filename(key, profile)
+        builder = data["builder"]
+        cached = not builder.is_building(key) and cache_path.is_file()
+        metrics.record(STAGE_CACHE_LOOKUP, time.perf_counter() - lookup_start)
+        if cached:
+            if cache_manager:
+                cache_manager.touch(key)
+            if hot_phrases and hot_phrases.max_bytes:
+                with metrics.timer(STAGE_DISK_READ):
+                    phrase = await self.hass.async_add_executor_job(
+                        read_cached_phrase,
+                        cache_path,
+                        hot_phrases.max_bytes,
+                        content_type,
+                    )
+                if phrase is not None:
+                    hot_phrases.put(key, phrase, len(phrase.body))
+                    return _serve_in_memory(request, phrase)
+            return _TimedFileResponse(cache_path, content_type, metrics, start)
+        sink = _ResponseSink(request)
+        try:
+            started = await builder.async_build(
+                key, paths, cache_path, silence_ms, sink, profile
             )
-        except (ValueError, OSError) as err:
+        except BUILD_ERRORS as err:
             LOGGER.exception(
                 "Failed to build phrase %s: %s",
                 phrase_id,
                 err,
             )
-            msg = (
-                "WAV format mismatch between clips"
-                if isinstance(err, ValueError) and "format" in str(err).lower()
-                else "Failed to build audio"
-            )
-            return web.Response(status=500, text=msg)
-        wav_bytes = await self.hass.async_add_executor_job(
-            cache_path.read_bytes,
-        )
-        return web.Response(body=wav_bytes, content_type="audio/wav")
+            if sink.response.prepared:
+                raise
+            return web.Response(status=500, text="Failed to build audio")
+        if not started:
+            if hot_phrases and (phrase := hot_phrases.get(key)) is not None:
+                return _serve_in_memory(request, phrase)
+            return _TimedFileResponse(cache_path, content_type, metrics, start)
+        if sink.connected:
+            await sink.response.write_eof()
+        return sink.response
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from typing import Any
+from urllib.parse import urlencode
+
 from homeassistant.components.media_player import MediaClass, MediaType
 from homeassistant.components.media_source import (
     BrowseMediaSource,
@@ -14,6 +17,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.network import NoURLAvailableError, get_url
 
 from .const import DOMAIN
+from .media import CODEC_PCM16, CODECS
+from .phrases import get_phrase_clips, get_phrase_duration
+from .profiles import async_profile_for_player, profile_query
 
 
 async def async_get_media_source(hass: HomeAssistant) -> HlVoxMediaSource:
@@ -21,6 +27,20 @@ async def async_get_media_source(hass: HomeAssistant) -> HlVoxMediaSource:
     return HlVoxMediaSource(hass)
 
 
+class PhraseBrowseMedia(BrowseMediaSource):
+    """A playable phrase, with its duration in seconds when known."""
+
+    def __init__(self, *, duration: float | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.duration = duration
+
+    def as_dict(self, *, parent: bool = True) -> dict[str, Any]:
+        response = super().as_dict(parent=parent)
+        if self.duration is not None:
+            response["duration"] = round(self.duration, 3)
+        return response
+
+
 class HlVoxMediaSource(MediaSource):
     """Media source for Half-Life VOX phrase announcements."""
 
@@ -37,9 +57,16 @@ class HlVoxMediaSource(MediaSource):
         self,
         item: MediaSourceItem,
     ) -> BrowseMediaSource:
-        """List defined phrases (or root)."""
+        """List defined phrases (or root).
+
+        Auto phrases from play_clips are only listed when browse_auto_phrases
+        is enabled, but can always be browsed to by identifier.
+        """
         config = self._get_config()
-        phrases = config.get("phrases") or {}
+        content_type = CODECS[config.get("output_codec", CODEC_PCM16)].content_type
+        phrases = sorted(config.get("phrases") or {})
+        if config.get("browse_auto_phrases") and config.get("auto_phrases"):
+            phrases += sorted(config["auto_phrases"])
         if not phrases:
             return BrowseMediaSource(
                 domain=DOMAIN,
@@ -52,16 +79,17 @@ class HlVoxMediaSource(MediaSource):
             )
         if not item.identifier:
             children = [
-                BrowseMediaSource(
+                PhraseBrowseMedia(
                     domain=DOMAIN,
                     identifier=phrase_id,
                     media_class=MediaClass.MUSIC,
-                    media_content_type="audio/wav",
+                    media_content_type=content_type,
                     title=phrase_id.replace("_", " ").title(),
                     can_play=True,
                     can_expand=False,
+                    duration=get_phrase_duration(config, phrase_id),
                 )
-                for phrase_id in sorted(phrases)
+                for phrase_id in phrases
             ]
             return BrowseMediaSource(
                 domain=DOMAIN,
@@ -73,23 +101,28 @@ class HlVoxMediaSource(MediaSource):
                 can_expand=True,
                 children=children,
             )
-        if item.identifier in phrases:
-            return BrowseMediaSource(
+        if get_phrase_clips(config, item.identifier) is not None:
+            return PhraseBrowseMedia(
                 domain=DOMAIN,
                 identifier=item.identifier,
                 media_class=MediaClass.MUSIC,
-                media_content_type="audio/wav",
+                media_content_type=content_type,
                 title=item.identifier.replace("_", " ").title(),
                 can_play=True,
                 can_expand=False,
+                duration=get_phrase_duration(config, item.identifier),
             )
         raise Unresolvable("Unknown phrase")
 
     async def async_resolve_media(self, item: MediaSourceItem) -> PlayMedia:
-        """Resolve phrase to a playable URL (our HTTP endpoint)."""
+        """Resolve phrase to a playable URL (our HTTP endpoint).
+
+        The output profile is chosen for the target media player (by entity
+        ID, then by its integration) and carried in the URL query; the MIME
+        type follows its codec, e.g. audio/flac for FLAC.
+        """
         config = self._get_config()
-        phrases = config.get("phrases") or {}
-        if item.identifier not in phrases:
+        if not item.identifier or get_phrase_clips(config, item.identifier) is None:
             raise Unresolvable("Unknown phrase")
         try:
             base = get_url(
@@ -104,4 +137,13 @@ class HlVoxMediaSource(MediaSource):
             ) from err
         base = base.rstrip("/")
         url = f"{base}/api/hl_vox/audio/{item.identifier}"
-        return PlayMedia(url, "audio/wav")
+        default_codec = config.get("output_codec", CODEC_PCM16)
+        profile = async_profile_for_player(
+            self.hass,
+            config.get("output_profiles") or {},
+            item.target_media_player,
+            default_codec,
+        )
+        if query := profile_query(profile, default_codec):
+            url += f"?{urlencode(query)}"
+        return PlayMedia(url, profile.output.content_type)
@@ -0,0 +1,115 @@
+"""Rolling timing histograms for the audio pipeline."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Samples kept per stage; percentiles describe the most recent ones
+METRICS_WINDOW = 512
+
+# Pipeline stages, in the order a request reaches them
+STAGE_REQUEST = "request"  # whole audio request, until the response is sent
+STAGE_CACHE_LOOKUP = "cache_lookup"  # render key, hot cache and cache file check
+STAGE_DISK_READ = "disk_read"  # cache file read into the hot cache
+STAGE_RENDER = "render"  # whole phrase build, incl. streaming it to a player
+STAGE_CLIP_LOAD = "clip_load"  # one clip's normalized PCM (store, cache or WAV)
+# Recorded by media._normalize_to_target, which cannot import this module
+STAGE_WAV_READ = "wav_read"  # reading and parsing a WAV file
+STAGE_NORMALIZE = "normalize"  # decode, downmix and resample to 11025 Hz mono
+STAGE_CONVERT = "convert"  # conversion of one clip to an output profile
+STAGE_ENCODE = "encode"  # output codec, per clip
+STAGE_CACHE_WRITE = "cache_write"  # writing encoded audio to the cache file
+STAGE_RESPONSE = "response"  # sending a finished phrase to the player
+STAGES = (
+    STAGE_REQUEST,
+    STAGE_CACHE_LOOKUP,
+    STAGE_DISK_READ,
+    STAGE_RENDER,
+    STAGE_CLIP_LOAD,
+    STAGE_WAV_READ,
+    STAGE_NORMALIZE,
+    STAGE_CONVERT,
+    STAGE_ENCODE,
+    STAGE_CACHE_WRITE,
+    STAGE_RESPONSE,
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """Durations per pipeline stage over a rolling window.
+
+    record() is safe to call from executor threads. Percentiles are
+    computed when read (sensor updates, diagnostics), not per sample.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one duration (seconds) for stage."""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Record how long the with block takes, also if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self, stage: str) -> dict[str, Any] | None:
+        """p50/p95/p99 and max of stage in milliseconds, or None if unseen.
+
+        count is the total number of samples, window how many of the most
+        recent ones the percentiles cover.
+        """
+        with self._lock:
+            samples = self._samples.get(stage)
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            count = self._counts[stage]
+        result: dict[str, Any] = {"count": count, "window": len(ordered)}
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = round(percentile(ordered, pct) * 1000, 3)
+        result["max"] = round(ordered[-1] * 1000, 3)
+        return result
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Summaries of every stage seen so far."""
+        with self._lock:
+            extra = sorted(set(self._samples) - set(STAGES))
+        return {
+            stage: summary
+            for stage in (*STAGES, *extra)
+            if (summary := self.summary(stage)) is not None
+        }
+
+    def clear(self) -> None:
+        """Forget all samples."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
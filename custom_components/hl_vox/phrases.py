@@ -0,0 +1,105 @@
+"""Registry of auto-generated phrases (from play_clips) and phrase lookup."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DEFAULT_SILENCE_MS, DOMAIN
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.auto_phrases"
+# Batch registry writes; play_clips may fire many times a minute
+SAVE_DELAY = 30
+
+
+class AutoPhraseRegistry:
+    """Bounded LRU of auto phrase_id -> clip list, optionally persisted.
+
+    Keeps memory flat however many distinct clip lists automations send,
+    while recently used ad-hoc IDs still resolve after a restart (e.g. a
+    media player re-fetching the URL it was given). A max_entries of 0 (or
+    less) means unlimited.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_entries: int, persist: bool) -> None:
+        self.max_entries = max_entries
+        self._phrases: OrderedDict[str, list[str]] = OrderedDict()
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, STORAGE_KEY) if persist else None
+        )
+
+    async def async_load(self) -> None:
+        """Load persisted phrases (oldest first)."""
+        if self._store is None:
+            return
+        stored = await self._store.async_load()
+        for phrase_id, clips in (stored or {}).get("phrases", []):
+            self._phrases[phrase_id] = clips
+        self._trim()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"phrases": list(self._phrases.items())}
+
+    def _trim(self) -> None:
+        if self.max_entries <= 0:
+            return
+        while len(self._phrases) > self.max_entries:
+            self._phrases.popitem(last=False)
+
+    @callback
+    def resize(self, max_entries: int) -> None:
+        """Change the bound, dropping the least recently used phrases."""
+        self.max_entries = max_entries
+        self._trim()
+
+    @callback
+    def add(self, phrase_id: str, clips: list[str]) -> None:
+        """Register (or refresh) an auto phrase."""
+        if self._phrases.get(phrase_id) == clips:
+            self._phrases.move_to_end(phrase_id)
+        else:
+            self._phrases[phrase_id] = list(clips)
+            self._phrases.move_to_end(phrase_id)
+            self._trim()
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get(self, phrase_id: str) -> list[str] | None:
+        """Return the clip list for phrase_id, or None."""
+        return self._phrases.get(phrase_id)
+
+    def __contains__(self, phrase_id: object) -> bool:
+        return phrase_id in self._phrases
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._phrases))
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+
+def get_phrase_clips(data: Mapping[str, Any], phrase_id: str) -> list[str] | None:
+    """Return the clips of a user-defined or auto phrase, or None if unknown."""
+    clips = (data.get("phrases") or {}).get(phrase_id)
+    if clips is not None:
+        return clips
+    auto_phrases: AutoPhraseRegistry | None = data.get("auto_phrases")
+    if auto_phrases is not None:
+        return auto_phrases.get(phrase_id)
+    return None
+
+
+def get_phrase_duration(data: Mapping[str, Any], phrase_id: str) -> float | None:
+    """Return how long a phrase plays in seconds, or None if it cannot be built."""
+    clip_names = get_phrase_clips(data, phrase_id)
+    if clip_names is None or data.get("catalog") is None:
+        return None
+    return data["catalog"].phrase_duration(
+        clip_names, data.get("silence_ms", DEFAULT_SILENCE_MS)
+    )
@@ -0,0 +1,101 @@
+"""Output profiles: the audio format a phrase is delivered in, per player."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .media import (
+    CODEC_PCM16,
+    CODECS,
+    OUTPUT_RATES,
+    TARGET_FRAMERATE,
+    TARGET_NCHANNELS,
+    OutputProfile,
+)
+
+
+def make_profile(config: Mapping[str, Any], default_codec: str) -> OutputProfile:
+    """Build a profile from its config; a missing codec means the default."""
+    return OutputProfile(
+        config.get("codec") or default_codec,
+        int(config.get("rate", TARGET_FRAMERATE)),
+        int(config.get("channels", TARGET_NCHANNELS)),
+    )
+
+
+def _validate_profile(config: dict[str, Any]) -> dict[str, Any]:
+    try:
+        make_profile(config, CODEC_PCM16)
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
+    return config
+
+
+# One profile: any field left out keeps the default format
+PROFILE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("codec"): vol.In(list(CODECS)),
+            vol.Optional("rate"): vol.All(vol.Coerce(int), vol.In(OUTPUT_RATES)),
+            vol.Optional("channels"): vol.All(vol.Coerce(int), vol.Range(min=1, max=2)),
+        }
+    ),
+    _validate_profile,
+)
+
+
+@callback
+def async_profile_for_player(
+    hass: HomeAssistant,
+    profiles: Mapping[str, Mapping[str, Any]],
+    entity_id: str | None,
+    default_codec: str,
+) -> OutputProfile:
+    """Return the profile for a media player.
+
+    profiles maps an entity ID or an integration (platform) name, e.g.
+    "dlna_dmr", to a profile; the entity ID wins. Players with neither get
+    the default format in default_codec.
+    """
+    config = None
+    if entity_id:
+        config = profiles.get(entity_id)
+        if config is None and (entry := er.async_get(hass).async_get(entity_id)):
+            config = profiles.get(entry.platform)
+    if config:
+        return make_profile(config, default_codec)
+    return OutputProfile(default_codec)
+
+
+def profile_query(profile: OutputProfile, default_codec: str) -> dict[str, str]:
+    """URL query parameters that select profile on the audio view.
+
+    The codec is pinned whenever it is not plain 16-bit PCM or differs from
+    the configured default, so the advertised type matches what is served.
+    """
+    query = {}
+    if profile.codec != CODEC_PCM16 or profile.codec != default_codec:
+        query["codec"] = profile.codec
+    if profile.rate != TARGET_FRAMERATE:
+        query["rate"] = str(profile.rate)
+    if profile.channels != TARGET_NCHANNELS:
+        query["channels"] = str(profile.channels)
+    return query
+
+
+def profile_from_query(query: Mapping[str, str], default_codec: str) -> OutputProfile:
+    """Parse the profile of an audio request; raise ValueError if invalid."""
+    return make_profile(
+        {
+            "codec": query.get("codec"),
+            "rate": query.get("rate", TARGET_FRAMERATE),
+            "channels": query.get("channels", TARGET_NCHANNELS),
+        },
+        default_codec,
+    )
@@ -0,0 +1,519 @@
+"""Build phrase WAVs into the filesystem cache, one build per phrase at a time."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import wave
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .catalog import ClipCatalog
+from .const import DEFAULT_SILENCE_MS, DOMAIN, PREWARM_CONCURRENCY, SIGNAL_CACHE_UPDATED
+from .media import (
+    CODEC_PCM16,
+    DEFAULT_RESAMPLE_QUALITY,
+    TARGET_FRAMERATE,
+    TARGET_SAMPWIDTH,
+    OutputProfile,
+    _normalize_to_target,
+    convert_pcm,
+    fit_pcm,
+    normalized_pcm_size,
+    silence_pcm,
+)
+from .metrics import (
+    STAGE_CACHE_WRITE,
+    STAGE_CLIP_LOAD,
+    STAGE_CONVERT,
+    STAGE_ENCODE,
+    STAGE_RENDER,
+    Metrics,
+)
+from .phrases import get_phrase_clips
+from .profiles import make_profile
+
+LOGGER = logging.getLogger(__name__)
+
+# Errors raised by a broken or unsupported clip file
+BUILD_ERRORS = (ValueError, OSError, EOFError, wave.Error)
+# Part of every render key; bump when the same inputs render to other bytes
+RENDER_VERSION = 1
+
+
+class MissingClipError(Exception):
+    """A phrase refers to a clip that is not in the sounds directory."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Missing clip: {name}")
+        self.name = name
+
+
+def render_key(
+    catalog: ClipCatalog,
+    clip_names: list[str],
+    silence_ms: int,
+    profile: OutputProfile = OutputProfile(),
+    quality: str = DEFAULT_RESAMPLE_QUALITY,
+) -> str:
+    """Content address of a rendered phrase, for the cache file and hot cache.
+
+    Hashes everything the output bytes depend on: each clip's name and
+    fingerprint (mtime/size from the catalog), the silence gap, the output
+    profile and, when anything is resampled, the resample quality. A
+    replaced clip or changed setting yields a new key, so stale renders are
+    never served and simply age out of the cache; the same clips under
+    different phrase IDs share one render. Raises MissingClipError.
+    """
+    clips = []
+    resampled = not profile.native
+    for name in clip_names:
+        info = catalog.get(name)
+        if info is None:
+            raise MissingClipError(name)
+        clips.append([name, *catalog.fingerprint(name)])
+        resampled = resampled or info.rate != TARGET_FRAMERATE
+    material = json.dumps(
+        [
+            RENDER_VERSION,
+            clips,
+            silence_ms,
+            [profile.codec, profile.rate, profile.channels],
+            quality if resampled else None,
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(material.encode(), digest_size=12).hexdigest()
+
+
+def cache_filename(key: str, profile: OutputProfile = OutputProfile()) -> str:
+    """Name of the cache file of a render key."""
+    return f"{key}.{profile.output.extension}"
+
+
+def clip_paths(catalog: ClipCatalog, clip_names: list[str]) -> list[Path]:
+    """Return the WAV path of each clip; raise MissingClipError if absent."""
+    paths = []
+    for name in clip_names:
+        info = catalog.get(name)
+        if info is None:
+            raise MissingClipError(name)
+        paths.append(info.path)
+    return paths
+
+
+async def async_clip_paths(
+    hass: HomeAssistant, catalog: ClipCatalog, clip_names: list[str]
+) -> list[Path]:
+    """Like clip_paths, but first bring the phrase's clips up to date.
+
+    The clips' mtime/size are checked so one overwritten in place gets a new
+    fingerprint (and the phrase a new render_key) right away, and the
+    catalog is rescanned once if a clip is missing, so clips added since
+    the last refresh are found without waiting for the next scheduled one.
+    """
+    await hass.async_add_executor_job(catalog.revalidate, clip_names)
+    try:
+        return clip_paths(catalog, clip_names)
+    except MissingClipError:
+        if not await hass.async_add_executor_job(catalog.refresh):
+            raise
+    return clip_paths(catalog, clip_names)
+
+
+class PhraseSink(Protocol):
+    """Receives a phrase while it is being built (e.g. an HTTP response)."""
+
+    async def start(self, content_length: int | None, content_type: str) -> None:
+        """Called once with the total size (None if not known), before any chunk."""
+
+    async def write(self, chunk: bytes | memoryview) -> None:
+        """Called with each piece of the file, header first."""
+
+
+@dataclass(slots=True)
+class CachedPhrase:
+    """A finished phrase WAV held in memory, with its HTTP validators.
+
+    The ETag uses the same mtime/size form as aiohttp's FileResponse, so a
+    phrase served from memory or from disk validates the same way.
+    """
+
+    body: bytes
+    etag: str
+    last_modified: float
+    content_type: str = "audio/wav"
+
+    @classmethod
+    def from_stat(
+        cls, body: bytes, st: os.stat_result, content_type: str = "audio/wav"
+    ) -> CachedPhrase:
+        return cls(
+            body, f"{st.st_mtime_ns:x}-{st.st_size:x}", st.st_mtime, content_type
+        )
+
+
+def read_cached_phrase(
+    cache_path: Path, max_bytes: int, content_type: str = "audio/wav"
+) -> CachedPhrase | None:
+    """Load a cache file into memory unless it exceeds max_bytes (blocking)."""
+    st = cache_path.stat()
+    if st.st_size > max_bytes:
+        return None
+    return CachedPhrase.from_stat(cache_path.read_bytes(), st, content_type)
+
+
+def _open_part_file(cache_dir: Path) -> tuple[BinaryIO, Path]:
+    """Open a unique temp file in the cache dir for a phrase being built."""
+    fd, name = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+    return os.fdopen(fd, "wb"), Path(name)
+
+
+def _write_encoded(
+    encoder: Any, pcm: bytes | memoryview, part_file: BinaryIO, metrics: Metrics
+) -> bytes | memoryview:
+    """Encode PCM, append it to the cache file and return the encoded bytes."""
+    with metrics.timer(STAGE_ENCODE):
+        chunk = encoder.feed(pcm)
+    with metrics.timer(STAGE_CACHE_WRITE):
+        part_file.write(chunk)
+    return chunk
+
+
+def _render_clip(
+    load_pcm: Callable[[Path], bytes],
+    path: Path,
+    size: int,
+    convert: Callable[[bytes | memoryview], bytes | memoryview] | None,
+    encoder: Any,
+    part_file: BinaryIO,
+    metrics: Metrics,
+) -> bytes | memoryview:
+    """Normalize one clip, convert it to the output profile, encode it into
+    the cache file and return the output."""
+    with metrics.timer(STAGE_CLIP_LOAD):
+        pcm = fit_pcm(load_pcm(path), size)
+    if convert is not None:
+        with metrics.timer(STAGE_CONVERT):
+            pcm = convert(pcm)
+    return _write_encoded(encoder, pcm, part_file, metrics)
+
+
+def _flush_encoded(encoder: Any, part_file: BinaryIO, metrics: Metrics) -> bytes:
+    """Write and return whatever the encoder still holds."""
+    with metrics.timer(STAGE_ENCODE):
+        chunk = encoder.flush()
+    with metrics.timer(STAGE_CACHE_WRITE):
+        part_file.write(chunk)
+    return chunk
+
+
+def _finish_part_file(
+    part_file: BinaryIO, part_path: Path, cache_path: Path
+) -> os.stat_result:
+    """Close the temp file, atomically move it into place and stat it."""
+    part_file.close()
+    os.replace(part_path, cache_path)
+    return cache_path.stat()
+
+
+def _discard_part_file(part_file: BinaryIO, part_path: Path) -> None:
+    part_file.close()
+    part_path.unlink(missing_ok=True)
+
+
+class PhraseBuilder:
+    """Single-flight builder for cached phrase WAVs.
+
+    Concurrent requests for the same key share one build: the first caller
+    starts it (and may stream it through a sink), later callers wait for the
+    same task and then read the finished cache file. The build runs as its
+    own task, so it completes even if the caller that started it goes away.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._inflight: dict[str, asyncio.Task[Path]] = {}
+        self.builds = 0
+
+    def is_building(self, key: str) -> bool:
+        """Return True if a build for key is in progress."""
+        return key in self._inflight
+
+    async def async_build(
+        self,
+        key: str,
+        paths: list[Path],
+        cache_path: Path,
+        silence_ms: int,
+        sink: PhraseSink | None = None,
+        profile: OutputProfile = OutputProfile(),
+    ) -> bool:
+        """Build cache_path unless a build for key is already running.
+
+        Return True if this call started the build (the sink, if given, was
+        fed the audio), False if it joined an existing one. Raises one of
+        BUILD_ERRORS if the build fails.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            await asyncio.shield(task)
+            return False
+        task = self.hass.async_create_task(
+            self._async_build(key, paths, cache_path, silence_ms, sink, profile),
+            f"{DOMAIN} build {key}",
+        )
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(task)
+        return True
+
+    async def async_render(
+        self, clip_names: list[str], profile: OutputProfile = OutputProfile()
+    ) -> tuple[Path, bool]:
+        """Make sure the phrase of clip_names is in the cache in profile.
+
+        Return the cache file and whether it had to be built (or a running
+        build was awaited). Raises MissingClipError or one of BUILD_ERRORS.
+        """
+        data = self.hass.data[DOMAIN]
+        catalog: ClipCatalog = data["catalog"]
+        silence_ms = data.get("silence_ms", DEFAULT_SILENCE_MS)
+        paths = await async_clip_paths(self.hass, catalog, clip_names)
+        key = render_key(
+            catalog,
+            clip_names,
+            silence_ms,
+            profile,
+            data.get("resample_quality", DEFAULT_RESAMPLE_QUALITY),
+        )
+        cache_path: Path = data["cache_dir"] / cache_filename(key, profile)
+        if cache_path.is_file() and not self.is_building(key):
+            return cache_path, False
+        await self.async_build(key, paths, cache_path, silence_ms, profile=profile)
+        return cache_path, True
+
+    async def async_prewarm(self, phrase_ids: list[str]) -> dict[str, Any]:
+        """Render phrases that are not cached yet, a few at a time.
+
+        Each phrase is rendered in the default output format and in every
+        distinct format from the output profiles, so players with a profile
+        are served from cache too. Concurrency is bounded by
+        PREWARM_CONCURRENCY so pre-rendering a long phrase list never
+        monopolizes the executor. Returns counts per (phrase, format) pair
+        and the duration for the service response.
+        """
+        data = self.hass.data[DOMAIN]
+        default_codec = data.get("output_codec", CODEC_PCM16)
+        profiles = list(
+            dict.fromkeys(
+                [
+                    OutputProfile(default_codec),
+                    *(
+                        make_profile(config, default_codec)
+                        for config in (data.get("output_profiles") or {}).values()
+                    ),
+                ]
+            )
+        )
+        semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+        counts = {"built": 0, "cached": 0, "failed": 0}
+        total = len(phrase_ids) * len(profiles)
+        start = time.monotonic()
+
+        async def _prewarm_one(
+            phrase_id: str, clip_names: list[str], profile: OutputProfile
+        ) -> None:
+            async with semaphore:
+                try:
+                    _, built = await self.async_render(clip_names, profile)
+                except (MissingClipError, *BUILD_ERRORS) as err:
+                    LOGGER.warning(
+                        "Failed to pre-render phrase %s as %s: %s",
+                        phrase_id,
+                        profile,
+                        err,
+                    )
+                    counts["failed"] += 1
+                    return
+            if not built:
+                counts["cached"] += 1
+                return
+            counts["built"] += 1
+            LOGGER.debug(
+                "Pre-rendered phrase %s as %s (%d/%d)",
+                phrase_id,
+                profile,
+                sum(counts.values()),
+                total,
+            )
+
+        jobs = []
+        for phrase_id in phrase_ids:
+            clip_names = get_phrase_clips(data, phrase_id)
+            if clip_names is None:
+                LOGGER.warning("Cannot pre-render unknown phrase %s", phrase_id)
+                counts["failed"] += len(profiles)
+                continue
+            jobs.extend(
+                _prewarm_one(phrase_id, clip_names, profile) for profile in profiles
+            )
+        await asyncio.gather(*jobs)
+        duration = time.monotonic() - start
+        LOGGER.info(
+            "Pre-rendered %d phrases in %d formats (%d already cached, %d failed)"
+            " in %.2f s",
+            counts["built"],
+            len(profiles),
+            counts["cached"],
+            counts["failed"],
+            duration,
+        )
+        return {**counts, "duration": round(duration, 3)}
+
+    async def _async_build(
+        self,
+        key: str,
+        paths: list[Path],
+        cache_path: Path,
+        silence_ms: int,
+        sink: PhraseSink | None,
+        profile: OutputProfile = OutputProfile(),
+    ) -> Path:
+        """Write the phrase to cache_path clip by clip, feeding sink as we go.
+
+        The data length is known from the clip headers (or the clip store
+        index) before any audio is decoded, so the WAV header goes out first
+        and each clip is sent as soon as it is normalized and encoded. For a
+        non-default profile each normalized clip and the silence gap are
+        converted separately; their converted lengths add up to the total.
+        """
+        self.builds += 1
+        data = self.hass.data[DOMAIN]
+        metrics: Metrics = data.get("metrics") or Metrics()
+        start = time.perf_counter()
+        clip_cache = data.get("clip_cache")
+        clip_store = data.get("clip_store")
+        hot_phrases = data.get("hot_phrases")
+        if clip_store:
+            load_pcm = clip_store.get
+            size_of = clip_store.pcm_size
+        else:
+            load_pcm = (
+                clip_cache.load
+                if clip_cache
+                else functools.partial(_normalize_to_target, record=metrics.record)
+            )
+            size_of = normalized_pcm_size
+        sizes = await self.hass.async_add_executor_job(
+            lambda: [size_of(p) for p in paths]
+        )
+        silence = silence_pcm(silence_ms)
+        convert = None
+        if not profile.native:
+            quality = data.get("resample_quality", DEFAULT_RESAMPLE_QUALITY)
+
+            def convert(pcm: bytes | memoryview) -> bytes | memoryview:
+                return convert_pcm(pcm, profile.rate, profile.channels, quality)
+
+            # Converted silence is still silence, just longer or wider
+            silence = bytes(
+                profile.frame_count(len(silence) // TARGET_SAMPWIDTH)
+                * profile.channels
+                * TARGET_SAMPWIDTH
+            )
+        output = profile.output
+        encoder = output.encoder()
+        frames = sum(profile.frame_count(size // TARGET_SAMPWIDTH) for size in sizes)
+        frames += len(silence) // (TARGET_SAMPWIDTH * profile.channels) * (
+            len(paths) - 1
+        )
+        data_size = profile.data_size(frames)
+        header = profile.header(frames)
+        # Keep the body for the hot-phrase cache if it is likely to fit the
+        # budget (FLAC's size is not known up front; 16-bit PCM bounds it)
+        parts: list[bytes | memoryview] | None = None
+        expected_size = (
+            frames * profile.channels * TARGET_SAMPWIDTH
+            if data_size is None
+            else data_size
+        )
+        if hot_phrases and len(header) + expected_size <= hot_phrases.max_bytes:
+            parts = [header]
+
+        part_file, part_path = await self.hass.async_add_executor_job(
+            _open_part_file, cache_path.parent
+        )
+        try:
+            await self.hass.async_add_executor_job(part_file.write, header)
+            if sink is not None:
+                await sink.start(
+                    None if data_size is None else len(header) + data_size,
+                    output.content_type,
+                )
+                await sink.write(header)
+            for i, (path, size) in enumerate(zip(paths, sizes)):
+                chunk = await self.hass.async_add_executor_job(
+                    _render_clip,
+                    load_pcm,
+                    path,
+                    size,
+                    convert,
+                    encoder,
+                    part_file,
+                    metrics,
+                )
+                await self._emit(chunk, sink, parts)
+                if i < len(paths) - 1:
+                    chunk = await self.hass.async_add_executor_job(
+                        _write_encoded, encoder, silence, part_file, metrics
+                    )
+                    await self._emit(chunk, sink, parts)
+            chunk = await self.hass.async_add_executor_job(
+                _flush_encoded, encoder, part_file, metrics
+            )
+            await self._emit(chunk, sink, parts)
+            st = await self.hass.async_add_executor_job(
+                _finish_part_file, part_file, part_path, cache_path
+            )
+        except BaseException:
+            _discard_part_file(part_file, part_path)
+            raise
+        if cache_manager := data.get("cache_manager"):
+            cache_manager.record_build(cache_path.stem, st.st_size)
+            async_dispatcher_send(self.hass, SIGNAL_CACHE_UPDATED)
+        if parts is not None:
+            hot_phrases.put(
+                cache_path.stem,
+                CachedPhrase.from_stat(b"".join(parts), st, output.content_type),
+                st.st_size,
+            )
+        metrics.record(STAGE_RENDER, time.perf_counter() - start)
+        if clip_cache:
+            LOGGER.debug("Built phrase %s; clip cache %s", key, clip_cache.stats())
+        return cache_path
+
+    @staticmethod
+    async def _emit(
+        chunk: bytes | memoryview,
+        sink: PhraseSink | None,
+        parts: list[bytes | memoryview] | None,
+    ) -> None:
+        """Pass an encoded chunk to the sink and the hot-cache body."""
+        if not chunk:
+            return
+        if sink is not None:
+            await sink.write(chunk)
+        if parts is not None:
+            parts.append(chunk)
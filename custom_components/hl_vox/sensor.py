@@ -0,0 +1,189 @@
+"""Sensors reporting the state of the HL VOX phrase cache."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SIGNAL_CACHE_UPDATED, SIGNAL_QUEUE_UPDATED
+from .metrics import (
+    STAGE_DISK_READ,
+    STAGE_RENDER,
+    STAGE_REQUEST,
+    STAGE_RESPONSE,
+    STAGES,
+)
+
+# Stage sensors enabled by default; the finer-grained ones are opt-in
+DEFAULT_STAGE_SENSORS = (STAGE_REQUEST, STAGE_RENDER, STAGE_DISK_READ, STAGE_RESPONSE)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up HL VOX sensors."""
+    async_add_entities(
+        [
+            HlVoxCacheSizeSensor(entry),
+            HlVoxQueueSensor(entry),
+            *(HlVoxStageTimeSensor(entry, stage) for stage in STAGES),
+        ]
+    )
+
+
+def _device_info(entry: ConfigEntry) -> DeviceInfo:
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+class HlVoxCacheSizeSensor(SensorEntity):
+    """Total size of the phrase WAV cache directory."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Phrase cache size"
+    _attr_icon = "mdi:database"
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_suggested_unit_of_measurement = UnitOfInformation.MEBIBYTES
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        self._attr_unique_id = f"{entry.entry_id}_cache_size"
+        self._attr_device_info = _device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_CACHE_UPDATED, self._async_cache_updated
+            )
+        )
+
+    @callback
+    def _async_cache_updated(self) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def _manager(self):
+        return (self.hass.data.get(DOMAIN) or {}).get("cache_manager")
+
+    @property
+    def native_value(self) -> int | None:
+        manager = self._manager
+        return manager.total_bytes if manager else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        manager = self._manager
+        if not manager:
+            return None
+        return {
+            "entries": manager.entries,
+            "max_bytes": manager.max_bytes,
+            "max_entries": manager.max_entries,
+            "ttl_seconds": manager.ttl_seconds,
+        }
+
+
+class HlVoxQueueSensor(SensorEntity):
+    """Announcements waiting in the per-player queues.
+
+    The attributes hold, per player that has used the queue, its depth, the
+    phrase playing, the estimated wait until the queue is drained, how long
+    the oldest announcement has waited (seconds) and how many were played
+    or coalesced.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Announcement queue"
+    _attr_icon = "mdi:playlist-play"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        self._attr_unique_id = f"{entry.entry_id}_queue"
+        self._attr_device_info = _device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_QUEUE_UPDATED, self._async_queue_updated
+            )
+        )
+
+    @callback
+    def _async_queue_updated(self) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def _announcer(self):
+        return (self.hass.data.get(DOMAIN) or {}).get("announcer")
+
+    @property
+    def native_value(self) -> int | None:
+        announcer = self._announcer
+        return announcer.depth if announcer else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        announcer = self._announcer
+        if not announcer:
+            return None
+        return {"players": announcer.as_dict()}
+
+
+class HlVoxStageTimeSensor(SensorEntity):
+    """p95 time of one audio pipeline stage, in milliseconds.
+
+    The attributes hold p50, p99, the maximum and the sample counts over
+    the rolling window (see metrics.Metrics). Polled, since timings are
+    recorded far more often than the state needs to change.
+    """
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, entry: ConfigEntry, stage: str) -> None:
+        self.stage = stage
+        self._attr_name = f"{stage.replace('_', ' ').capitalize()} time"
+        self._attr_unique_id = f"{entry.entry_id}_time_{stage}"
+        self._attr_device_info = _device_info(entry)
+        self._attr_entity_registry_enabled_default = stage in DEFAULT_STAGE_SENSORS
+
+    @property
+    def _summary(self) -> dict[str, Any] | None:
+        metrics = (self.hass.data.get(DOMAIN) or {}).get("metrics")
+        return metrics.summary(self.stage) if metrics else None
+
+    @property
+    def native_value(self) -> float | None:
+        summary = self._summary
+        return summary["p95"] if summary else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        summary = self._summary
+        if not summary:
+            return None
+        return {k: v for k, v in summary.items() if k != "p95"}
@@ -0,0 +1,55 @@
+"""Load the integration's modules without a running Home Assistant.
+
+Shared by the tests and benchmarks/bench_pipeline.py, which exercise the
+phrase builder and the audio view against a minimal hass stand-in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_DIR = ROOT / "custom_components" / "hl_vox"
+
+
+def import_integration_modules(*names: str) -> dict[str, types.ModuleType] | None:
+    """Import modules of the integration without setting it up.
+
+    The package's __init__ (which registers services and needs a running
+    Home Assistant) is bypassed by registering the package paths directly.
+    Returns None if Home Assistant is not installed.
+    """
+    try:
+        import homeassistant.bootstrap  # noqa: F401 - HA's own import order
+    except ImportError:
+        return None
+    for name, path in (
+        ("custom_components", PACKAGE_DIR.parent),
+        ("custom_components.hl_vox", PACKAGE_DIR),
+    ):
+        if name not in sys.modules:
+            package = types.ModuleType(name)
+            package.__path__ = [str(path)]
+            sys.modules[name] = package
+    return {
+        name: importlib.import_module(f"custom_components.hl_vox.{name}")
+        for name in names
+    }
+
+
+class StubHass:
+    """Just enough of HomeAssistant for the view and the phrase builder."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    async def async_add_executor_job(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def async_create_task(self, coro, name=None):
+        return asyncio.get_running_loop().create_task(coro, name=name)
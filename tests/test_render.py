@@ -0,0 +1,211 @@
+"""Tests for the single-flight phrase builder in render.py and the audio view."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import wave
+from pathlib import Path
+
+import pytest
+from hass_stub import StubHass, import_integration_modules
+
+pytest.importorskip("homeassistant")
+modules = import_integration_modules("catalog", "clip_cache", "http", "render")
+ClipCatalog = modules["catalog"].ClipCatalog
+PhraseBuilder = modules["render"].PhraseBuilder
+cache_filename = modules["render"].cache_filename
+render_key = modules["render"].render_key
+
+CALLERS = 8
+SILENCE_MS = 150
+
+
+class _Sink:
+    """Collects what the builder streams, like an HTTP response would."""
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.content_length: int | None = None
+        self.body = bytearray()
+
+    async def start(self, content_length: int | None, content_type: str) -> None:
+        self.content_length = content_length
+        self.started.set()
+
+    async def write(self, chunk: bytes | memoryview) -> None:
+        self.body += chunk
+
+
+def _write_clip(path: Path, rate: int, seconds: float) -> None:
+    frames = bytearray()
+    for i in range(int(rate * seconds)):
+        value = int(0.5 * 32767 * math.sin(2 * math.pi * 440 * i / rate))
+        frames += value.to_bytes(2, "little", signed=True)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+
+
+@pytest.fixture
+def phrase(tmp_path: Path) -> tuple[StubHass, list[str]]:
+    """A hass stand-in with a catalog of three clips, and their names."""
+    sounds = tmp_path / "sounds"
+    sounds.mkdir()
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    # 22050 Hz clips are resampled, so a build takes long enough to overlap
+    names = ["attention", "security", "breach"]
+    for name in names:
+        _write_clip(sounds / f"{name}.wav", 22050, 1.0)
+    catalog = ClipCatalog(sounds, tmp_path / "clip_catalog.json")
+    catalog.refresh()
+    hass = StubHass()
+    hass.data["hl_vox"] = {
+        "phrases": {"alert": names},
+        "sounds_path": sounds,
+        "catalog": catalog,
+        "cache_dir": cache_dir,
+        "silence_ms": SILENCE_MS,
+    }
+    hass.data["hl_vox"]["builder"] = PhraseBuilder(hass)
+    return hass, names
+
+
+def _cache_path(hass: StubHass, names: list[str]) -> tuple[str, Path]:
+    data = hass.data["hl_vox"]
+    key = render_key(data["catalog"], names, SILENCE_MS)
+    return key, data["cache_dir"] / cache_filename(key)
+
+
+def test_concurrent_builds_share_one_render(phrase) -> None:
+    """Callers of one key build once; each gets the bytes of the cache file."""
+    hass, names = phrase
+    builder: PhraseBuilder = hass.data["hl_vox"]["builder"]
+    key, cache_path = _cache_path(hass, names)
+    paths = [hass.data["hl_vox"]["catalog"].get(name).path for name in names]
+    sinks = [_Sink() for _ in range(CALLERS)]
+
+    async def _serve(sink: _Sink) -> bool:
+        started = await builder.async_build(key, paths, cache_path, SILENCE_MS, sink)
+        if not started:
+            # Joiners are served the finished file, as the audio view does
+            body = cache_path.read_bytes()
+            await sink.start(len(body), "audio/wav")
+            await sink.write(body)
+        return started
+
+    async def _run() -> list[bool]:
+        return await asyncio.gather(*(_serve(sink) for sink in sinks))
+
+    started = asyncio.run(_run())
+
+    assert builder.builds == 1
+    assert started.count(True) == 1
+    body = cache_path.read_bytes()
+    for sink in sinks:
+        assert bytes(sink.body) == body
+        assert sink.content_length == len(body)
+
+
+def test_concurrent_renders_share_one_render(phrase) -> None:
+    hass, names = phrase
+    builder: PhraseBuilder = hass.data["hl_vox"]["builder"]
+    _, cache_path = _cache_path(hass, names)
+
+    async def _run() -> list[tuple[Path, bool]]:
+        return await asyncio.gather(
+            *(builder.async_render(names) for _ in range(CALLERS))
+        )
+
+    results = asyncio.run(_run())
+
+    assert builder.builds == 1
+    assert results == [(cache_path, True)] * CALLERS
+    with wave.open(str(cache_path), "rb") as w:
+        assert w.getframerate() == 11025
+        assert w.getnframes() > 0
+
+
+def test_cancelled_caller_leaves_finished_cache_file(phrase) -> None:
+    """The build outlives the request that started it."""
+    hass, names = phrase
+    builder: PhraseBuilder = hass.data["hl_vox"]["builder"]
+    key, cache_path = _cache_path(hass, names)
+    paths = [hass.data["hl_vox"]["catalog"].get(name).path for name in names]
+    sink = _Sink()
+
+    async def _run() -> None:
+        first = asyncio.create_task(
+            builder.async_build(key, paths, cache_path, SILENCE_MS, sink)
+        )
+        await sink.started.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert builder.is_building(key)
+        while builder.is_building(key):
+            await asyncio.sleep(0.001)
+
+    asyncio.run(_run())
+
+    assert builder.builds == 1
+    with wave.open(str(cache_path), "rb") as w:
+        assert w.getframerate() == 11025
+        assert w.getnframes() * 2 + 44 == sink.content_length
+    assert list(cache_path.parent.iterdir()) == [cache_path]
+
+
+def test_concurrent_requests_share_one_render(phrase) -> None:
+    """Parallel GETs of an uncached phrase build it once and get equal bodies.
+
+    The first request streams the build; the others join it and are served
+    the finished file or the hot cache.
+    """
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    hass, names = phrase
+    data = hass.data["hl_vox"]
+    data["hot_phrases"] = modules["clip_cache"].ByteLru(8 << 20)
+    builder: PhraseBuilder = data["builder"]
+    key, cache_path = _cache_path(hass, names)
+    started: list[bool] = []
+    async_build = builder.async_build
+
+    async def _async_build(*args, **kwargs) -> bool:
+        result = await async_build(*args, **kwargs)
+        started.append(result)
+        return result
+
+    builder.async_build = _async_build
+    view = modules["http"].HlVoxAudioView(hass)
+    app = web.Application()
+
+    async def _handler(request: web.Request) -> web.StreamResponse:
+        return await view.get(request, **request.match_info)
+
+    app.router.add_get("/api/hl_vox/audio/{phrase_id}", _handler)
+
+    async def _run() -> list[tuple[int, bytes]]:
+        async with TestClient(TestServer(app)) as client:
+
+            async def _get() -> tuple[int, bytes]:
+                response = await client.get("/api/hl_vox/audio/alert")
+                return response.status, await response.read()
+
+            results = await asyncio.gather(*(_get() for _ in range(CALLERS)))
+            while builder.is_building(key):
+                await asyncio.sleep(0.001)
+            return results
+
+    results = asyncio.run(_run())
+
+    assert builder.builds == 1
+    # One request built the phrase; the others joined it while it ran
+    assert started.count(True) == 1
+    assert len(started) > 1
+    body = cache_path.read_bytes()
+    assert results == [(200, body)] * CALLERS